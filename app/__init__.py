@@ -1,10 +1,8 @@
-import os
-import requests
 from flask import Flask, request, jsonify, redirect
 from flask_caching import Cache
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import StrOutputParser
+from app.startup import timed, warm_up
+from app.llm import chat_model
+from app import llm_cache
 
 cache = Cache()
 
@@ -13,15 +11,11 @@ neo_cache = Cache(config={'CACHE_TYPE': 'simple'})
 
 @neo_cache.cached(timeout=3600, key_prefix='nasa_summary')
 def nasa_summary():
+    from app.catalog import get_neos
     try:
-        key = os.getenv("NASA_API_KEY", "DEMO_KEY")
-        resp = requests.get(
-            "https://api.nasa.gov/neo/rest/v1/neo/browse",
-            params={"api_key": key, "size": 20},
-            timeout=10,
-        )
-        resp.raise_for_status()
-        neos = resp.json()["near_earth_objects"]
+        neos = get_neos(20)
+        if not neos:
+            raise LookupError("catalog empty")
         lines = []
         for n in neos:
             el = n["orbital_data"]
@@ -35,43 +29,55 @@ def nasa_summary():
         return "NASA data temporarily unavailable."
 
 def impact_summary(lat, lon, E):
-    from app.physics import overpressure
-    rings = [2, 5, 10, 20, 50]
+    from app.damage import damage_radii
     lines = [f"Impact energy: {E:.2e} J"]
-    for r in rings:
-        op = overpressure(E, r) / 1000
-        lines.append(f"{r} km → {op:.1f} kPa over-pressure")
+    for z in damage_radii(E):
+        if z["radius_km"] is None:
+            lines.append(f"{z['label']} beyond the modelled range")
+        elif z["radius_km"] > 0:
+            lines.append(f"{z['label']} out to {z['radius_km']:.1f} km")
     return "\n".join(lines)
 
 # ---------- Flask factory ----------
 def create_app():
-    app = Flask(__name__, static_folder="../static", template_folder="templates")
-    app.config.from_object("app.config.Config")
-    cache.init_app(app, config={"CACHE_TYPE": "simple"})
-    neo_cache.init_app(app)
+    with timed("config"):
+        app = Flask(__name__, static_folder="../static", template_folder="templates")
+        app.config.from_object("app.config.Config")
+        cache.init_app(app, config={"CACHE_TYPE": "simple"})
+        neo_cache.init_app(app)
+
+    # keep the local NEO catalog fresh in the background
+    with timed("catalog_sync"):
+        from app.catalog import start_background_sync
+        start_background_sync(app.config["CATALOG_SYNC_INTERVAL"])
 
     # register blueprints
-    from app.neo import bp as neo_bp
-    from app.quiz import bp as quiz_bp
-    from app.game import bp as game_bp
-    from app.impact import bp as impact_bp
-    from app.shelters import bp as shelters_bp
-
-    app.register_blueprint(neo_bp, url_prefix="/neo")
-    app.register_blueprint(quiz_bp, url_prefix="/quiz")
-    app.register_blueprint(game_bp, url_prefix="/game")
-    app.register_blueprint(impact_bp, url_prefix="/impact")
-    app.register_blueprint(shelters_bp, url_prefix="/shelters")
+    for name in ("neo", "quiz", "game", "impact", "shelters"):
+        with timed(f"blueprint.{name}"):
+            module = __import__(f"app.{name}", fromlist=["bp"])
+            app.register_blueprint(module.bp, url_prefix=f"/{name}")
 
     @app.route("/")
     def index():
         return redirect("/game/front")
 
-    # ---------- AI chat ----------
-    llm = ChatOpenAI(temperature=0.7, model="gpt-3.5-turbo")
+    @app.route("/upstream-stats")
+    def upstream_stats():
+        """Per-host counters and circuit-breaker state of outbound calls."""
+        from app.upstream import metrics
+        return jsonify(metrics())
+
+    @app.route("/llm-cache-stats")
+    def llm_cache_stats():
+        """Hit rate and saved model time of the LLM response cache, per endpoint."""
+        return jsonify(llm_cache.stats())
 
+    # ---------- AI chat ----------
     @app.post("/chat")
     def chat():
+        from langchain.prompts import ChatPromptTemplate
+        from langchain.schema import StrOutputParser
+
         data = request.get_json(force=True)
         user_msg = data.get("message", "")
         page = data.get("page", "neo")
@@ -96,8 +102,16 @@ def create_app():
             ("system", persona + "\n\n{context}"),
             ("human", "{question}")
         ])
-        chain = prompt | llm | StrOutputParser()
-        reply = chain.invoke({"context": context, "question": user_msg})
+        chain = prompt | chat_model("gpt-3.5-turbo", 0.7) | StrOutputParser()
+        inputs = {"context": context, "question": user_msg}
+        cache_args = ("chat", 0.7, persona, user_msg, context)
+        if data.get("stream"):
+            from app.sse import sse_text_stream, sse_response
+            return sse_response(sse_text_stream(llm_cache.cached_stream(*cache_args, lambda: chain.stream(inputs))))
+        reply = llm_cache.cached_call(*cache_args, lambda: chain.invoke(inputs))
         return jsonify({"reply": reply})
 
+    if app.config["STARTUP_WARMUP"]:
+        warm_up()
+
     return app
\ No newline at end of file
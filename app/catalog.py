@@ -0,0 +1,236 @@
+"""
+Local NEO catalog.
+
+A SQLite copy of the NeoWs browse feed that every NEO consumer reads from
+(/neo/data, /quiz/api/asteroids, nasa_summary(), the /neo chatbot), so no
+request waits on the NASA API. `sync()` pages through NeoWs incrementally
+and only rewrites objects whose payload changed; `start_background_sync()`
+runs it on a timer. Point NEOWS_URL at a local fixture server for testing.
+
+Every worker process shares the database, so runs are coordinated through
+sync_state rather than in-process locks: a sync holds a lease row while it
+pages (others skip instead of racing on next_page), and the background
+timers of all workers claim one shared next_run_at slot, so the host syncs
+once per interval however many workers it runs. With
+CATALOG_SYNC_INTERVAL=0 the sync can run from cron instead:
+
+    python -m app.catalog sync [pages]
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+from app import upstream
+from app.config import Config
+
+PAGE_SIZE = 20
+SYNC_LEASE = 300                 # seconds a sync may hold the lease before others may take over
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS neos (
+    id         TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    is_pha     INTEGER NOT NULL,
+    digest     TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_sync_lock = threading.Lock()
+_sync_thread = None
+
+
+@contextmanager
+def _connect(db_path=None):
+    path = Path(db_path or Config.CATALOG_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _digest(obj: dict) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+
+# --------------------------------------------------
+# --------------  read side ------------------------
+# --------------------------------------------------
+def get_neos(limit: int = 30, db_path=None) -> list[dict]:
+    """
+    First `limit` catalogued NEOs in NeoWs browse order.
+    An empty store is bootstrapped with one synchronous sync.
+    """
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT data FROM neos ORDER BY rowid LIMIT ?", (limit,)
+        ).fetchall()
+    if not rows and sync(max_pages=-(-limit // PAGE_SIZE), db_path=db_path):
+        return get_neos(limit, db_path)
+    return [json.loads(r[0]) for r in rows]
+
+
+def all_neos(db_path=None) -> list[dict]:
+    """Every catalogued NEO (no bootstrap sync)."""
+    with _connect(db_path) as conn:
+        rows = conn.execute("SELECT data FROM neos ORDER BY rowid").fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def count(db_path=None) -> int:
+    with _connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM neos").fetchone()[0]
+
+
+def version(db_path=None) -> str:
+    """Changes whenever an object is added or its payload changes."""
+    with _connect(db_path) as conn:
+        n, last = conn.execute("SELECT COUNT(*), MAX(updated_at) FROM neos").fetchone()
+    return f"{n}:{last}"
+
+
+# --------------------------------------------------
+# --------------  write side -----------------------
+# --------------------------------------------------
+def upsert(neos: list[dict], db_path=None) -> int:
+    """Insert new objects and rewrite changed ones. Returns rows touched."""
+    now = time.time()
+    rows = [(str(n["id"]), n.get("name", ""), int(bool(n.get("is_potentially_hazardous_asteroid"))),
+             _digest(n), json.dumps(n), now) for n in neos]
+    with _connect(db_path) as conn:
+        before = conn.total_changes
+        conn.executemany(
+            """
+            INSERT INTO neos (id, name, is_pha, digest, data, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name, is_pha = excluded.is_pha,
+                digest = excluded.digest, data = excluded.data,
+                updated_at = excluded.updated_at
+            WHERE neos.digest != excluded.digest
+            """,
+            rows,
+        )
+        return conn.total_changes - before
+
+
+def _claim(key: str, until: float, db_path=None) -> bool:
+    """
+    Set sync_state[key] to `until` unless it already holds a later time,
+    atomically across processes. True if this caller got it.
+    """
+    with _connect(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        if row and float(row[0]) > time.time():
+            return False
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(until)))
+    return True
+
+
+def _release(key: str, db_path=None) -> None:
+    with _connect(db_path) as conn:
+        conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+
+
+def sync(max_pages: int | None = None, db_path=None) -> int:
+    """
+    Fetch the next `max_pages` NeoWs browse pages, resuming from the page
+    the previous run stopped at and wrapping to page 0 after the last one.
+    Returns the number of objects inserted or updated; 0 without fetching
+    if another process is syncing the same database.
+    """
+    max_pages = max_pages or Config.CATALOG_SYNC_PAGES
+    with _sync_lock:
+        if not _claim("lease_until", time.time() + SYNC_LEASE, db_path):
+            return 0
+        try:
+            return _sync_pages(max_pages, db_path)
+        finally:
+            _release("lease_until", db_path)
+
+
+def _sync_pages(max_pages, db_path) -> int:
+    changed = 0
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = 'next_page'").fetchone()
+    page = int(row[0]) if row else 0
+
+    for _ in range(max_pages):
+        try:
+            resp = upstream.request(
+                "GET",
+                f"{Config.NEOWS_URL}/neo/browse",
+                params={"api_key": Config.NASA_API_KEY, "page": page, "size": PAGE_SIZE},
+                timeout=15,
+            )
+            resp.raise_for_status()
+            body = resp.json()
+        except (requests.RequestException, ValueError):
+            break
+        changed += upsert(body.get("near_earth_objects", []), db_path)
+        total_pages = body.get("page", {}).get("total_pages", page + 1)
+        page = page + 1 if page + 1 < total_pages else 0
+
+        with _connect(db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('next_page', ?)",
+                (str(page),),
+            )
+    return changed
+
+
+def sync_if_due(interval: int, db_path=None) -> int | None:
+    """
+    sync() if no process on this database has started a scheduled run in
+    the last `interval` seconds; None if it was not due.
+    """
+    if not _claim("next_run_at", time.time() + interval, db_path):
+        return None
+    return sync(db_path=db_path)
+
+
+def start_background_sync(interval: int | None = None) -> None:
+    """
+    Check every `interval` seconds, in a daemon thread (one per process),
+    whether the shared schedule is due, so the host syncs once per interval.
+    """
+    global _sync_thread
+    interval = Config.CATALOG_SYNC_INTERVAL if interval is None else interval
+    if interval <= 0 or (_sync_thread and _sync_thread.is_alive()):
+        return
+
+    def loop():
+        while True:
+            try:
+                sync_if_due(interval)
+            except Exception:
+                pass  # keep serving the last good catalog
+            time.sleep(interval)
+
+    _sync_thread = threading.Thread(target=loop, name="neo-catalog-sync", daemon=True)
+    _sync_thread.start()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != "sync":
+        sys.exit(__doc__)
+    n = sync(int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    print(f"{n} objects inserted or updated, {count()} catalogued")
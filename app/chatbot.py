@@ -1,13 +1,11 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
 from app.config import Config
+from app.geo02 import nearest
+from app.llm import chain, chat_model
 
 OPENAI_API_KEY = Config.OPENAI_API_KEY
 
 # Prompt template for shelter advice
-prompt = ChatPromptTemplate.from_template(
-    """
+PROMPT_TEMPLATE = """
 You are an emergency assistant. The user may provide their location and nearby shelters.
 Answer clearly which shelter they should go to. If there are no shelters nearby, advise what to do.
 Provide step-by-step safety instructions if needed.
@@ -15,27 +13,87 @@ Provide step-by-step safety instructions if needed.
 User question: {question}
 Nearby shelters: {shelters_list}
 """
-)
-
-chain = LLMChain(
-    llm=ChatOpenAI(
-        model="gpt-3.5-turbo",
-        temperature=0.7,
-        openai_api_key=OPENAI_API_KEY
-    ),
-    prompt=prompt
-)
-
-def get_shelter_advice(question: str, shelters_list: list[dict]) -> str:
+
+def _build_chain():
+    from langchain.prompts import ChatPromptTemplate
+    from langchain.chains import LLMChain
+    return LLMChain(
+        llm=chat_model("gpt-3.5-turbo", 0.7),
+        prompt=ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+    )
+
+def format_shelters(shelters_list: list[dict], user_lat: float = None, user_lon: float = None,
+                    k: int = None, blast_radius_km: float = 0.0) -> str:
+    """
+    Prompt text for the shelter list. With the user's location only the k
+    nearest shelters (outside blast_radius_km) are listed, with distances.
+    """
+    if user_lat is not None and user_lon is not None:
+        k = Config.SHELTER_ADVICE_TOP_K if k is None else k
+        shelters_list = nearest(user_lat, user_lon, shelters_list, k, blast_radius_km)
+    if not shelters_list:
+        return "No shelters found nearby."
+    return "\n".join(
+        f"{s['name']} ({s['lat']:.5f},{s['lon']:.5f})"
+        + (f", {s['distance_km']} km away" if "distance_km" in s else "")
+        for s in shelters_list
+    )
+
+def get_shelter_advice(question: str, shelters_list: list[dict], user_lat: float = None,
+                       user_lon: float = None, k: int = None, blast_radius_km: float = 0.0) -> str:
     """
     Generate advice about which shelter to go to.
     :param question: The user's question
     :param shelters_list: List of nearby shelters [{name, lat, lon}, ...]
+    :param user_lat, user_lon: User location; enables top-k nearest ranking
+    :param k: Shelters to include (default Config.SHELTER_ADVICE_TOP_K)
+    :param blast_radius_km: Skip shelters closer than this to the user
     :return: String answer from the LLM
     """
-    if shelters_list:
-        shelters_str = "\n".join([f"{s['name']} ({s['lat']},{s['lon']})" for s in shelters_list])
-    else:
-        shelters_str = "No shelters found nearby."
+    shelters_str = format_shelters(shelters_list, user_lat, user_lon, k, blast_radius_km)
+    return chain("shelter_advice", _build_chain).run(question=question, shelters_list=shelters_str)
+
+
+if __name__ == "__main__":
+    # python -m app.chatbot [--live]  → advisor prompt size, build time and end-to-end
+    # get_shelter_advice() latency, full list vs top-k. Without --live the model is a
+    # stub costing STUB_BASE_MS plus STUB_MS_PER_1K_TOKENS per 1000 prompt tokens.
+    import random
+    import sys
+    import time
+    from app import llm
+
+    STUB_BASE_MS, STUB_MS_PER_1K_TOKENS = 400, 30
+
+    class _StubChain:
+        def run(self, question, shelters_list):
+            prompt_tokens = len(PROMPT_TEMPLATE.format(question=question, shelters_list=shelters_list)) // 4
+            time.sleep((STUB_BASE_MS + STUB_MS_PER_1K_TOKENS * prompt_tokens / 1000) / 1000)
+            return "Go to the nearest shelter."
+
+    live = "--live" in sys.argv
+    if not live:
+        llm._chains["shelter_advice"] = _StubChain()
+    print(f"model: {'gpt-3.5-turbo' if live else f'stub, {STUB_BASE_MS} ms + {STUB_MS_PER_1K_TOKENS} ms/1k tokens'}")
 
-    return chain.run(question=question, shelters_list=shelters_str)
+    try:
+        import tiktoken
+        tokens = lambda s: len(tiktoken.encoding_for_model("gpt-3.5-turbo").encode(s))
+        tokens("")
+    except Exception:                      # no tiktoken or no cached encoding: ~4 chars/token
+        tokens = lambda s: len(s) // 4
+    random.seed(0)
+    for count in (10, 100, 1_000, 10_000):
+        shelters = [{"name": f"Shelter {n}", "lat": 37.8 + random.uniform(-0.2, 0.2),
+                     "lon": -122.4 + random.uniform(-0.2, 0.2)} for n in range(count)]
+        for label, args in (("all", ()), ("top-k", (37.8, -122.4))):
+            t0 = time.perf_counter()
+            text = PROMPT_TEMPLATE.format(question="Where should I go?", shelters_list=format_shelters(shelters, *args))
+            ms = 1000 * (time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            try:
+                get_shelter_advice("Where should I go?", shelters, *args)
+                advice = f"advice in {1000 * (time.perf_counter() - t0):8.1f} ms"
+            except Exception as e:                 # e.g. the full list overflows the context window
+                advice = f"advice failed: {type(e).__name__}"
+            print(f"{count:>6} shelters {label:>5}: {tokens(text):>7} prompt tokens, built in {ms:6.1f} ms, {advice}")
@@ -9,6 +9,83 @@ if dotenv_path.exists():
 class Config:   # <-- Uppercase
     SECRET_KEY = os.getenv("SECRET_KEY", "dev")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    NASA_API_KEY = os.getenv("NASA_API_KEY", "i4qSfG0QQG1E05NrJ8NEr3RyMkmAD7dB83edeElz")
+    NEOWS_URL = os.getenv("NEOWS_URL", "https://api.nasa.gov/neo/rest/v1")
+    OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+    ELEVATION_URL = os.getenv("ELEVATION_URL", "https://api.open-meteo.com/v1/elevation")
+
+    # outbound HTTP (app/upstream.py)
+    UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", 15))     # seconds, when the caller sets none
+    UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", 2))        # extra attempts for idempotent calls
+    UPSTREAM_BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", 0.5))    # seconds, doubled per retry, full jitter
+    UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", 10))   # keep-alive connections per host
+    UPSTREAM_CACHE_SIZE = int(os.getenv("UPSTREAM_CACHE_SIZE", 4096))   # cached JSON responses
+    BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", 5))        # consecutive failed calls that open a host's circuit
+    BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 30))     # seconds before a trial call
+
+    # local NEO catalog (app/catalog.py)
+    CATALOG_DB = os.getenv("CATALOG_DB", str(Path(__file__).parent.parent / "instance" / "neo_catalog.sqlite3"))
+    CATALOG_SYNC_INTERVAL = int(os.getenv("CATALOG_SYNC_INTERVAL", 3600))   # seconds, 0 = no background sync
+    CATALOG_SYNC_PAGES = int(os.getenv("CATALOG_SYNC_PAGES", 5))            # browse pages fetched per sync run
+
+    # startup (app/startup.py): build LLM clients and chatbot knowledge in a
+    # background thread after create_app instead of on the first request
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+
+    # shared LLM clients (app/llm.py)
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))      # concurrent requests per process
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))                    # seconds
+    LLM_MODEL_TIMEOUTS = os.getenv("LLM_MODEL_TIMEOUTS", "gpt-3.5-turbo=30,gpt-4o-mini-tts=30")   # model=seconds,...
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+
+    # LLM response cache (app/llm_cache.py), shared by workers; empty LLM_CACHE_DB disables it
+    LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", str(Path(__file__).parent.parent / "instance" / "llm_cache.sqlite3"))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 3600))                          # seconds
+    LLM_CACHE_TTLS = os.getenv("LLM_CACHE_TTLS", "neo_chat=86400,chat=3600,policy=3600")   # endpoint=seconds,...
+    LLM_CACHE_OPT_IN = os.getenv("LLM_CACHE_OPT_IN", "")       # endpoints cached even at temperature > 0: chat,policy
+
+    # synthesized speech for /neo/chat (app/tts_cache.py)
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", str(Path(__file__).parent.parent / "instance" / "tts_cache"))
+    TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", 256))
+
+    # orbit-geometry cache (app/orbit_cache.py)
+    ORBIT_CACHE_MAX_MB = int(os.getenv("ORBIT_CACHE_MAX_MB", 64))
+    ORBIT_CACHE_DIR = os.getenv("ORBIT_CACHE_DIR", "")              # empty = memory only
+
+    # /neo/data wire format: "packed" (float32 buffers) or "json" (legacy plotly traces)
+    NEO_WIRE_FORMAT = os.getenv("NEO_WIRE_FORMAT", "packed")
+    EPHEMERIS_CACHE_DAYS = int(os.getenv("EPHEMERIS_CACHE_DAYS", 20000))      # per-day planet positions kept (app/ephemeris.py)
+    NEO_FRAMES_MAX_POINTS = int(os.getenv("NEO_FRAMES_MAX_POINTS", 1_000_000))   # frames × bodies per /neo/frames
+
+    # impact zone stories (app/story.py)
+    STORY_WORKERS = int(os.getenv("STORY_WORKERS", 8))          # concurrent LLM calls per process
+    STORY_CACHE_SIZE = int(os.getenv("STORY_CACHE_SIZE", 1024))  # memoized (zone, crater, seismic, tsunami)
+
+    # /impact elevation grids (app/dem.py)
+    ELEVATION_GRID_MAX_CELLS = int(os.getenv("ELEVATION_GRID_MAX_CELLS", 64 * 64))
+
+    # Monte Carlo impact uncertainty (app/montecarlo.py)
+    MC_WORKERS = int(os.getenv("MC_WORKERS", 0))                 # process pool size; 0 = one per core
+    MC_CHUNK = int(os.getenv("MC_CHUNK", 100_000))               # samples per chunk / seed stream
+    MC_MAX_SAMPLES = int(os.getenv("MC_MAX_SAMPLES", 1_000_000))  # per /impact/montecarlo call
+
+    # land/sea lookup (app/earth.py): HTTP only if the bundled mask is missing
+    LANDMASK_HTTP_FALLBACK = os.getenv("LANDMASK_HTTP_FALLBACK", "1") == "1"
+
+    # shelters (app/osm.py, app/shelter_index.py)
+    SHELTER_SOURCE = os.getenv("SHELTER_SOURCE", "auto")    # auto | index | overpass
+    OVERPASS_TILE_TTL = int(os.getenv("OVERPASS_TILE_TTL", 24 * 3600))   # seconds a cached geohash tile stays fresh
+    OVERPASS_TILE_STALE = int(os.getenv("OVERPASS_TILE_STALE", 7 * 24 * 3600))   # then served stale while refreshing
+    OVERPASS_TILE_TIMEOUT = int(os.getenv("OVERPASS_TILE_TIMEOUT", 15))      # seconds per tile query (server and client)
+    OVERPASS_TILE_RETRIES = int(os.getenv("OVERPASS_TILE_RETRIES", 1))
+    OVERPASS_SEARCH_TIMEOUT = float(os.getenv("OVERPASS_SEARCH_TIMEOUT", 20))  # total wait per search; late tiles -> partial
+    OVERPASS_CONCURRENCY = int(os.getenv("OVERPASS_CONCURRENCY", 2))         # parallel tile queries (Overpass allows ~2 slots per IP)
+    SHELTER_INDEX_DIR = os.getenv("SHELTER_INDEX_DIR", str(Path(__file__).parent.parent / "instance" / "shelter_index"))
+    SHELTER_STORE_MAX_MB = int(os.getenv("SHELTER_STORE_MAX_MB", 32))     # in-process LRU of search results / maps
+    SHELTER_STORE_DIR = os.getenv("SHELTER_STORE_DIR", "")               # shared by workers; empty = memory only
+    SHELTER_STORE_TTL = int(os.getenv("SHELTER_STORE_TTL", 24 * 3600))   # seconds a stored result stays downloadable
+    SHELTER_ADVICE_TOP_K = int(os.getenv("SHELTER_ADVICE_TOP_K", 5))     # nearest shelters passed to the advisor prompt
+
     K_t   = 4.184e12          # 1 kt TNT in J
     RHO_I = 3300              # impactor density kg/m³
     RHO_T = 2700              # target density kg/m³
@@ -0,0 +1,102 @@
+"""
+Radial damage profiles for the impact simulator.
+
+Evaluates the app.physics models on a dense log-spaced radial grid, finds
+the radius out to which each quantity stays above a damage threshold and
+returns those radii as GeoJSON rings around the impact point.
+"""
+import numpy as np
+from app.physics import overpressure_batch, wind_ms_batch, thermal_batch, seismic_batch
+from app.geo02 import circle_ring
+
+PSI = 6894.76            # Pa
+CAL_CM2 = 41840.0        # J/m²
+
+
+def mmi_to_magnitude(mmi):
+    """Magnitude felt as Modified Mercalli intensity `mmi` (Gutenberg–Richter M = 1 + 2/3·I)."""
+    return 1 + 2 * mmi / 3
+
+
+# quantity → [(threshold, label), ...] in the units the physics functions return
+DEFAULT_THRESHOLDS = {
+    "overpressure": [(20 * PSI, "20 psi: heavy concrete buildings destroyed"),
+                     (5 * PSI, "5 psi: most buildings collapse"),
+                     (1 * PSI, "1 psi: windows shatter")],
+    "thermal": [(8 * CAL_CM2, "3rd-degree burns"),
+                (5 * CAL_CM2, "2nd-degree burns")],
+    "seismic": [(mmi_to_magnitude(7), "MMI VII: considerable structural damage"),
+                (mmi_to_magnitude(5), "MMI V: felt by nearly everyone")],
+    "wind": [],
+}
+
+
+def radial_profile(E_J, r_min=0.01, r_max=5000.0, n=512):
+    """All four damage quantities on an n-point log-spaced grid of radii (km)."""
+    r = np.geomspace(r_min, r_max, n)
+    op = overpressure_batch(E_J, r)
+    return {
+        "r_km": r,
+        "overpressure": op,
+        "wind": wind_ms_batch(op),
+        "thermal": thermal_batch(E_J, r),
+        "seismic": seismic_batch(E_J, r),
+    }
+
+
+# km beyond which a model is not used for radii: the far-field seismic
+# branch (r >= 700 km) rises again with distance
+MAX_RANGE_KM = {"seismic": 700.0}
+
+
+def threshold_radius(r, values, threshold, r_max=None):
+    """
+    Outermost radius (km, below r_max if given) at which `values` falls
+    below threshold, interpolated in log r between grid points. 0 if the
+    threshold is never reached; None (unbounded) if it is still reached
+    at the edge of the grid or of r_max.
+    """
+    if r_max is not None:
+        keep = r < r_max
+        r, values = r[keep], values[keep]
+    above = np.flatnonzero(values >= threshold)
+    if above.size == 0:
+        return 0.0
+    k = above[-1]
+    if k == len(r) - 1:
+        return None
+    v0, v1 = values[k], values[k + 1]
+    t = (v0 - threshold) / (v0 - v1) if v0 != v1 else 0.0
+    return float(np.exp(np.log(r[k]) + t * (np.log(r[k + 1]) - np.log(r[k]))))
+
+
+def damage_radii(E_J, thresholds=None, profile=None):
+    """
+    [{quantity, threshold, label, radius_km}, ...] for every configured
+    threshold; radius_km is None when it reaches the edge of the profile.
+    """
+    thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+    profile = profile or radial_profile(E_J)
+    out = []
+    for quantity, levels in thresholds.items():
+        for value, label in levels:
+            out.append({
+                "quantity": quantity,
+                "threshold": value,
+                "label": label,
+                "radius_km": threshold_radius(profile["r_km"], profile[quantity], value,
+                                              MAX_RANGE_KM.get(quantity)),
+            })
+    return out
+
+
+def damage_geojson(lat, lon, radii, n=64):
+    """GeoJSON FeatureCollection with one polygon ring per non-zero, bounded radius."""
+    return {
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [circle_ring(lat, lon, z["radius_km"], n)]},
+            "properties": z,
+        } for z in radii if z["radius_km"]],
+    }
@@ -0,0 +1,146 @@
+"""
+Elevation model for the impact simulator.
+
+A global 0.25° DEM (720 × 1440 cells, int16 metres, row 0 at 90°N,
+column 0 at 180°W, sea floor negative) read through a memory map: a point
+lookup is one array read and a grid is one vectorized bilinear resample,
+capped at ELEVATION_GRID_MAX_CELLS cells whatever the radius.
+
+The bundled grid was built from SRTM30_PLUS relief (the degree-300
+spherical-harmonic model srtmp300.msl shipped with SHTOOLS, synthesized on
+a 0.125° grid, ~70 km resolution). Rebuild it from a finer global ETOPO /
+GEBCO raster with:
+
+    python -m app.dem build ETOPO_2022_v1_60s_N90W180_surface.nc   (needs netCDF4)
+    python -m app.dem build elevation.npy                           (2-D array, north-up, global)
+
+If the file is missing, available() is False, elevation_grid() returns
+None and callers report the elevation as unknown.
+"""
+import base64
+import math
+from pathlib import Path
+
+import numpy as np
+from app.config import Config
+
+RES_DEG = 0.25
+ROWS, COLS = 720, 1440
+DEM_PATH = Path(__file__).parent / "data" / "dem_0p25deg.bin"
+EARTH_R = 6371
+
+_dem = None
+
+
+def available() -> bool:
+    return DEM_PATH.exists()
+
+
+def _grid():
+    global _dem
+    if _dem is None:
+        _dem = np.memmap(DEM_PATH, dtype="<i2", mode="r", shape=(ROWS, COLS))
+    return _dem
+
+
+def height(lat: float, lon: float) -> float:
+    """Elevation in metres of the DEM cell containing (lat, lon)."""
+    row = min(int((90 - min(max(lat, -90), 90)) / RES_DEG), ROWS - 1)
+    col = min(int(((lon + 180) % 360) / RES_DEG), COLS - 1)
+    return float(_grid()[row, col])
+
+
+def sample(lat, lon):
+    """Bilinearly interpolated elevation (m) at arrays of points."""
+    dem = _grid()
+    y = np.clip((90 - np.asarray(lat, dtype=float)) / RES_DEG - 0.5, 0, ROWS - 1)
+    x = ((np.asarray(lon, dtype=float) + 180) % 360) / RES_DEG - 0.5
+    r0 = np.minimum(np.floor(y).astype(int), ROWS - 2)
+    c0 = np.floor(x).astype(int)
+    fy, fx = y - r0, x - c0
+    c0, c1 = c0 % COLS, (c0 + 1) % COLS            # wraps across the antimeridian
+    top = dem[r0, c0] * (1 - fx) + dem[r0, c1] * fx
+    bottom = dem[r0 + 1, c0] * (1 - fx) + dem[r0 + 1, c1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def grid_axes(lat, lon, radius_km, max_cells=None):
+    """Latitudes and longitudes of an n × n grid spanning ±radius_km, n² <= max_cells."""
+    max_cells = max_cells or Config.ELEVATION_GRID_MAX_CELLS
+    n = max(int(math.isqrt(max_cells)), 2)
+    dlat = min(math.degrees(radius_km / EARTH_R), 90)
+    dlon = min(dlat / max(math.cos(math.radians(lat)), 1e-6), 180)
+    lats = np.clip(np.linspace(lat + dlat, lat - dlat, n), -90, 90)
+    lons = (np.linspace(lon - dlon, lon + dlon, n) + 180) % 360 - 180
+    return lats, lons
+
+
+def elevation_grid(lat, lon, radius_km, max_cells=None):
+    """
+    (heights, lats, lons, source): a north-up float grid of elevations (m)
+    around (lat, lon), at most max_cells cells. None if no DEM is installed.
+    """
+    if not available():
+        return None
+    lats, lons = grid_axes(lat, lon, radius_km, max_cells)
+    heights = sample(lats[:, None], lons[None, :])
+    return heights, lats, lons, "dem"
+
+
+def encode(heights, lats, lons, source, fmt="int16"):
+    """
+    Compact JSON form of a grid: heights quantized to whole metres as
+    little-endian int16, base64-encoded (fmt="int16"), or nested lists
+    (fmt="json").
+    """
+    out = {
+        "rows": int(heights.shape[0]), "cols": int(heights.shape[1]),
+        "north": float(lats[0]), "south": float(lats[-1]),
+        "west": float(lons[0]), "east": float(lons[-1]),
+        "units": "m", "source": source,
+    }
+    q = quantize(heights)
+    if fmt == "json":
+        out["data"] = q.tolist()
+    else:
+        out["dtype"] = "int16"
+        out["data"] = base64.b64encode(q.tobytes()).decode()
+    return out
+
+
+def quantize(heights):
+    return np.clip(np.rint(heights), -32768, 32767).astype("<i2")
+
+
+def build(source, out_path=DEM_PATH):
+    """Area-average a global north-up elevation raster down to the bundled 0.25° int16 grid."""
+    source = str(source)
+    if source.endswith(".nc"):
+        try:
+            import netCDF4
+        except ImportError as e:
+            raise RuntimeError("netCDF import needs netCDF4: pip install netCDF4") from e
+        with netCDF4.Dataset(source) as ds:
+            var = next(v for v in ds.variables.values() if v.ndim == 2)
+            z = np.asarray(var[:], dtype=np.float32)
+            lat_name = var.dimensions[0]
+            if ds.variables[lat_name][0] < ds.variables[lat_name][-1]:
+                z = z[::-1]                                   # south-up → north-up
+    else:
+        z = np.load(source, mmap_mode="r")
+    f_r, f_c = z.shape[0] // ROWS, z.shape[1] // COLS
+    out = np.empty((ROWS, COLS), dtype="<i2")
+    for r in range(ROWS):                                     # row blocks keep memory low
+        block = np.asarray(z[r * f_r:(r + 1) * f_r, :COLS * f_c], dtype=np.float32)
+        out[r] = quantize(block.reshape(f_r, COLS, f_c).mean(axis=(0, 2)))
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out.tofile(out_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] != "build":
+        sys.exit(__doc__)
+    build(sys.argv[2])
+    print(f"wrote {DEM_PATH}")
@@ -1,11 +1,27 @@
 import requests
+from app import landmask, upstream
+from app.config import Config
+
 
 def is_ocean(lat, lon):
+    """
+    True if (lat, lon) is sea. Uses the bundled offline land mask; the
+    open-meteo HTTP lookup is only a fallback when the mask is missing.
+    """
+    if landmask.available():
+        return not landmask.is_land(lat, lon)
+    if Config.LANDMASK_HTTP_FALLBACK:
+        return _is_ocean_http(round(lat, 1), round(lon, 1))
+    return False
+
+
+def _is_ocean_http(lat, lon):
+    # open-meteo has no land/sea variable; its DEM reports sea cells at <= 0 m
     try:
-        mask = requests.get(
-            f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=weathercode&forecast_days=1",
-            timeout=2
-        ).json()["daily"]["land_sea_mask"][0]
-        return mask == 0
-    except:
-        return False
\ No newline at end of file
+        elevation = upstream.get_json(
+            Config.ELEVATION_URL, {"latitude": lat, "longitude": lon},
+            ttl=30 * 24 * 3600, stale_ttl=365 * 24 * 3600, timeout=2, retries=0,
+        )["elevation"][0]
+        return elevation <= 0
+    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError):
+        return False
@@ -0,0 +1,134 @@
+"""
+Planetary ephemeris.
+
+NASA/JPL "Approximate Positions of the Planets" (Standish, Table 1,
+valid 1800–2050): J2000 Keplerian elements plus linear rates per Julian
+century for the eight planets (Earth = Earth–Moon barycentre), evaluated
+for arrays of Julian dates in one vectorized pass through
+orbits.kepler_to_xyz. Accuracy is a few arc-minutes for the inner planets.
+
+Positions at whole UTC days (0h, JD = n + 0.5) are memoized per day, so
+the NEO tracker, /neo/frames and the MOID screen share one computation.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from app.config import Config
+from app.orbits import kepler_to_xyz, julian_date
+
+J2000 = 2451545.0
+
+PLANETS = ("Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune")
+
+# a (AU), e, I (°), L (°), ϖ long. of perihelion (°), Ω (°) at J2000 ...
+_ELEMENTS = np.array([
+    [0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+    [0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+    [1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+    [1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+    [5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+    [9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+    [19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+    [30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+])
+# ... and their rates per Julian century
+_RATES = np.array([
+    [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081],
+    [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418],
+    [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0],
+    [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343],
+    [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106],
+    [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794],
+    [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589],
+    [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664],
+])
+
+_days = OrderedDict()            # day number (JD − 0.5) → (planets, 3) km
+_days_lock = threading.Lock()
+
+
+def index(name: str) -> int:
+    return PLANETS.index(name.capitalize())
+
+
+def day_jd(unix_time=None) -> float:
+    """Julian date of 0h UTC on the day of a Unix timestamp (default: today)."""
+    return float(np.floor(julian_date(unix_time) - 0.5) + 0.5)
+
+
+def elements(jd):
+    """
+    (planets, len(jd), 6) array of (a, e, i, Ω, ω, M), angles in degrees,
+    at Julian dates `jd`.
+    """
+    T = (np.atleast_1d(np.asarray(jd, dtype=np.float64)) - J2000) / 36525
+    a, e, i, L, varpi, Omega = np.moveaxis(_ELEMENTS[:, None, :] + _RATES[:, None, :] * T[None, :, None], -1, 0)
+    return np.stack([a, e, i, Omega, varpi - Omega, L - varpi], axis=-1)
+
+
+def _compute(jd):
+    a, e, i, Omega, omega, M = np.moveaxis(elements(jd), -1, 0)
+    return np.stack(kepler_to_xyz(a, e, i, Omega, omega, M), axis=1)     # (planets, 3, n)
+
+
+def positions(jd):
+    """
+    Heliocentric ecliptic positions (km) of all eight planets at Julian
+    dates `jd`: (planets, 3, len(jd)). Whole UTC days come from, and
+    fill, the per-day cache; missing days are computed together.
+    """
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    days = jd - 0.5
+    if not np.array_equal(days, np.floor(days)):
+        return _compute(jd)
+    keys = days.astype(np.int64).tolist()
+    with _days_lock:
+        cached = [_days.get(k) for k in keys]
+        for k, hit in zip(keys, cached):
+            if hit is not None:
+                _days.move_to_end(k)
+    missing = sorted({k for k, hit in zip(keys, cached) if hit is None})
+    if missing:
+        fresh = _compute(np.asarray(missing, dtype=np.float64) + 0.5)
+        with _days_lock:
+            for col, k in enumerate(missing):
+                _days[k] = fresh[:, :, col]
+            while len(_days) > Config.EPHEMERIS_CACHE_DAYS:
+                _days.popitem(last=False)
+        computed = dict(zip(missing, np.moveaxis(fresh, -1, 0)))
+        cached = [computed[k] if hit is None else hit for k, hit in zip(keys, cached)]
+    return np.stack(cached, axis=-1)
+
+
+def position(name: str, jd=None) -> list[float]:
+    """[x, y, z] (km) of one planet, by default at 0h UTC today."""
+    return [float(v) for v in positions(day_jd() if jd is None else jd)[index(name), :, 0]]
+
+
+def orbit_elements(name: str, jd=None) -> tuple:
+    """(a, e, i, Ω, ω) of one planet's orbit, by default for today."""
+    return tuple(float(v) for v in elements(day_jd() if jd is None else jd)[index(name), 0, :5])
+
+
+def info() -> dict:
+    with _days_lock:
+        return {"days_cached": len(_days), "max_days": Config.EPHEMERIS_CACHE_DAYS}
+
+
+if __name__ == "__main__":
+    import time
+
+    jd = day_jd() + np.arange(3650)                  # ten years of daily positions
+    t0 = time.perf_counter()
+    _compute(jd)
+    t1 = time.perf_counter()
+    positions(jd)
+    t2 = time.perf_counter()
+    positions(jd)
+    t3 = time.perf_counter()
+    print(f"8 planets × {len(jd)} days: compute {1000 * (t1 - t0):.1f} ms | "
+          f"cold cache {1000 * (t2 - t1):.1f} ms | warm cache {1000 * (t3 - t2):.1f} ms")
+    for name in PLANETS:
+        x, y, z = position(name)
+        print(f"{name:>8}: r = {np.hypot(np.hypot(x, y), z) / 149597870.7:6.3f} AU")
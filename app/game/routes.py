@@ -1,17 +1,14 @@
 # app/game.py
+from importlib.util import find_spec
 from flask import Blueprint, render_template, request, jsonify
 from app.config import Config
 
-# Import LangChain components with error handling
-try:
-    from langchain_openai import ChatOpenAI
-    from langchain.prompts import ChatPromptTemplate
-    from langchain_core.output_parsers import StrOutputParser
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+# LangChain is imported when the advisor is first used; only check it is installed
+LANGCHAIN_AVAILABLE = all(find_spec(m) for m in ("langchain", "langchain_openai", "langchain_core"))
 
 from app.game import bp 
+from app.sse import sse_text_stream, sse_response
+from app.llm import chain, chat_model
 
 def get_advisor_chain():
     if not LANGCHAIN_AVAILABLE:
@@ -22,14 +19,19 @@ def get_advisor_chain():
         return None
     
     try:
-        llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=openai_api_key
-        )
-        
-        advisor_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are Dr. Astra, the Chief Scientific Advisor to the Global Asteroid Defense Initiative (GADI). 
+        return chain("game_advisor", _build_advisor_chain)
+    except Exception as e:
+        print(f"Error initializing AI advisor: {e}")
+        return None
+
+def _build_advisor_chain():
+    from langchain.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = chat_model("gpt-3.5-turbo", 0.7)
+
+    advisor_prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are Dr. Astra, the Chief Scientific Advisor to the Global Asteroid Defense Initiative (GADI). 
             Your role is to provide strategic recommendations to the Director based on the current game state.
             
             Analyze the situation and provide:
@@ -43,13 +45,10 @@ def get_advisor_chain():
             Be direct but not alarmist. Use bullet points for clarity.
             
             Current game state:"""),
-            ("human", "{game_state}")
-        ])
-        
-        return advisor_prompt | llm | StrOutputParser()
-    except Exception as e:
-        print(f"Error initializing AI advisor: {e}")
-        return None
+        ("human", "{game_state}")
+    ])
+    
+    return advisor_prompt | llm | StrOutputParser()
 
 @bp.route("/")
 def index():
@@ -81,6 +80,8 @@ def get_advice():
         
         game_state = request.json.get("game_state", {})
         formatted_state = format_game_state(game_state)
+        if request.json.get("stream"):
+            return sse_response(sse_text_stream(advisor_chain.stream({"game_state": formatted_state})))
         advice = advisor_chain.invoke({"game_state": formatted_state})
         
         return jsonify({"advice": advice})
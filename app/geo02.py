@@ -1,8 +1,102 @@
 import math
+import numpy as np
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
     a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1))*math.cos(math.radians(lat2))*math.sin(dlon/2)**2
-    return 2 * R * math.asin(math.sqrt(a))
\ No newline at end of file
+    return 2 * R * math.asin(math.sqrt(a))
+
+def haversine_batch(lat1, lon1, lat2, lon2):
+    """haversine() over NumPy arrays (km); arguments broadcast."""
+    R = 6371
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * R * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+def nearest(lat, lon, points, k=5, min_km=0.0):
+    """
+    The k points ({lat, lon, ...} dicts) closest to (lat, lon), nearest first,
+    each copied with a "distance_km" key. Points closer than min_km (e.g.
+    inside a blast radius) are skipped.
+    """
+    if not points:
+        return []
+    dist = haversine_batch(lat, lon, [p["lat"] for p in points], [p["lon"] for p in points])
+    cand = np.flatnonzero(dist >= min_km)
+    if cand.size > k:
+        cand = cand[np.argpartition(dist[cand], k - 1)[:k]]
+    cand = cand[np.argsort(dist[cand], kind="stable")]
+    return [{**points[i], "distance_km": round(float(dist[i]), 2)} for i in cand]
+
+def circle_ring(lat, lon, radius_km, n=64):
+    """Closed [[lon, lat], ...] ring of points radius_km from (lat, lon) on a sphere."""
+    R = 6371
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    d = radius_km / R
+    brg = np.linspace(0, 2 * np.pi, n + 1)
+    lat2 = np.arcsin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * np.cos(brg))
+    lon2 = lon1 + np.arctan2(np.sin(brg) * math.sin(d) * math.cos(lat1),
+                             math.cos(d) - math.sin(lat1) * np.sin(lat2))
+    lon2 = (np.degrees(lon2) + 540) % 360 - 180
+    ring = np.column_stack([lon2, np.degrees(lat2)]).round(6)
+    ring[-1] = ring[0]
+    return ring.tolist()
+
+_GEOHASH32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_cell_size(precision):
+    """(dlat, dlon) in degrees of one geohash tile."""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** ((bits + 1) // 2)
+
+def geohash_encode(lat, lon, precision):
+    lat_rng, lon_rng = [-90.0, 90.0], [-180.0, 180.0]
+    out, ch, bit, even = [], 0, 0, True
+    while len(out) < precision:
+        rng, val = (lon_rng, lon) if even else (lat_rng, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if val >= mid:
+            ch, rng[0] = ch * 2 + 1, mid
+        else:
+            ch, rng[1] = ch * 2, mid
+        even, bit = not even, bit + 1
+        if bit == 5:
+            out.append(_GEOHASH32[ch])
+            ch, bit = 0, 0
+    return "".join(out)
+
+def geohash_bbox(gh):
+    """(south, west, north, east) of a geohash tile."""
+    lat_rng, lon_rng = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for c in gh:
+        v = _GEOHASH32.index(c)
+        for shift in range(4, -1, -1):
+            rng = lon_rng if even else lat_rng
+            mid = (rng[0] + rng[1]) / 2
+            if (v >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_rng[0], lon_rng[0], lat_rng[1], lon_rng[1]
+
+def geohash_cover(lat, lon, radius_km, precision):
+    """Geohash tiles covering the circle of radius_km around (lat, lon)."""
+    dlat_t, dlon_t = geohash_cell_size(precision)
+    dlat = math.degrees(radius_km / 6371)
+    south, north = max(lat - dlat, -90), min(lat + dlat, 90)
+    coslat = min(math.cos(math.radians(south)), math.cos(math.radians(north)))
+    dlon = 180 if coslat <= 1e-6 else min(math.degrees(radius_km / (6371 * coslat)), 180)
+    tiles = set()
+    la = math.floor((south + 90) / dlat_t) * dlat_t - 90
+    while la < north:
+        lo = math.floor((lon - dlon + 180) / dlon_t) * dlon_t - 180
+        while lo < lon + dlon:
+            wrapped = (lo + dlon_t / 2 + 180) % 360 - 180
+            tiles.add(geohash_encode(min(la + dlat_t / 2, 90), wrapped, precision))
+            lo += dlon_t
+        la += dlat_t
+    return sorted(tiles)
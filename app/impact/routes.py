@@ -1,29 +1,32 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, Response
 from app.config import Config
 from app.physics import overpressure, wind_ms, thermal, crater, seismic 
+from app.physics import overpressure_batch, wind_ms_batch, thermal_batch, crater_batch, seismic_batch
 from app.earth import is_ocean
-from app.story import generate_zone_story
-import random
+from app.story import generate_zone_stories, iter_zone_stories
+from app.sse import sse_event, sse_response
+from app.damage import radial_profile, damage_radii, damage_geojson, DEFAULT_THRESHOLDS
+from app import dem, montecarlo
+import math
+import numpy as np
 from app.impact import bp  # This is the main blueprint
 
+MAX_BATCH_CELLS = 250_000   # energies × distances per /sim_batch call
+
 def get_terrain_height(lat, lon):
-    """Get elevation data (mock for faster loading)"""
-    return random.uniform(0, 3000)
-
-def generate_elevation_map(lat, lon, radius_km):
-    """Generate elevation grid (mock for faster loading)"""
-    grid = []
-    step = max(0.01, radius_km / 10)
-    for lat_offset in range(-int(radius_km), int(radius_km) + 1):
-        row = []
-        for lon_offset in range(-int(radius_km), int(radius_km) + 1):
-            distance = (lat_offset**2 + lon_offset**2)**0.5
-            base_elevation = random.uniform(0, 1000)
-            if distance < radius_km / 2:
-                base_elevation *= (1 - distance / (radius_km / 2))
-            row.append(base_elevation)
-        grid.append(row)
-    return grid
+    """Elevation (m) at the impact point from the DEM, None if none is installed"""
+    if dem.available():
+        return dem.height(lat, lon)
+    return None
+
+def generate_elevation_map(lat, lon, radius_km, fmt="int16"):
+    """
+    Elevation grid spanning ±radius_km around the impact, resampled to at
+    most ELEVATION_GRID_MAX_CELLS cells and encoded by dem.encode; None
+    without a DEM.
+    """
+    grid = dem.elevation_grid(lat, lon, radius_km)
+    return dem.encode(*grid, fmt=fmt) if grid else None
 
 @bp.route("/")
 def impact_page():
@@ -51,22 +54,161 @@ def sim():
     ocean = is_ocean(lat, lon)
     ts = 0.14 * c * 1000 if ocean else 0
 
-    # Generate zone stories
-    texts = {
-        "crater": generate_zone_story("crater", c, s, op, w, th, ts),
-        "shock": generate_zone_story("shock", c, s, op, w, th, ts),
-        "quake": generate_zone_story("quake", c, s, op, w, th, ts),
-        "tsunami": generate_zone_story("tsunami", c, s, op, w, th, ts) if ocean else "No tsunami risk."
-    }
-
-    return jsonify({
+    result = {
         "crater": round(c, 1),
         "seismic": round(s, 1),
         "wind": int(w),
         "thermal": int(th),
         "tsunami": round(ts, 1),
         "angle": ang,
-        "texts": texts,
         "terrain_height": get_terrain_height(lat, lon),
-        "elevation_map": generate_elevation_map(lat, lon, max(c, s, ts))
-    })
\ No newline at end of file
+        "elevation_map": generate_elevation_map(lat, lon, max(c, s, ts), data.get("elevation_format", "int16"))
+    }
+    zones = ["crater", "shock", "quake"] + (["tsunami"] if ocean else [])
+
+    # {"stream": true} → physics now, one "story" event per zone as it finishes
+    if data.get("stream"):
+        def events():
+            yield sse_event(result, "physics")
+            if not ocean:
+                yield sse_event({"zone": "tsunami", "text": "No tsunami risk."}, "story")
+            try:
+                for zone, text in iter_zone_stories(zones, c, s, op, w, th, ts):
+                    yield sse_event({"zone": zone, "text": text}, "story")
+            except Exception as e:
+                yield sse_event({"error": str(e)}, "error")
+            yield sse_event({}, "done")
+        return sse_response(events())
+
+    # Generate zone stories concurrently
+    texts = generate_zone_stories(zones, c, s, op, w, th, ts)
+    texts.setdefault("tsunami", "No tsunami risk.")
+    return jsonify({**result, "texts": texts})
+
+@bp.route("/elevation")
+def elevation():
+    """
+    ?lat&lon&radius_km[&cells][&format=int16|json|binary]. "binary" returns
+    the raw little-endian int16 grid (north-up, row-major) with the grid
+    bounds in X-Grid-* headers. 503 if no DEM is installed.
+    """
+    try:
+        lat = float(request.args["lat"])
+        lon = float(request.args["lon"])
+        radius = float(request.args["radius_km"])
+        cells = min(request.args.get("cells", Config.ELEVATION_GRID_MAX_CELLS, int), Config.ELEVATION_GRID_MAX_CELLS)
+    except (KeyError, ValueError):
+        return jsonify({"error": "Expected numeric lat, lon and radius_km"}), 400
+    if not all(map(math.isfinite, (lat, lon, radius))) or radius <= 0:
+        return jsonify({"error": "lat and lon must be finite and radius_km finite and > 0"}), 400
+    grid = dem.elevation_grid(lat, lon, radius, max(cells, 4))
+    if grid is None:
+        return jsonify({"error": "No elevation model installed (build one with: python -m app.dem build <raster>)"}), 503
+    heights, lats, lons, source = grid
+    if request.args.get("format") == "binary":
+        return Response(dem.quantize(heights).tobytes(), mimetype="application/octet-stream", headers={
+            "X-Grid-Shape": f"{heights.shape[0]},{heights.shape[1]}",
+            "X-Grid-Bounds": f"{lats[0]},{lons[0]},{lats[-1]},{lons[-1]}",   # north, west, south, east
+            "X-Grid-Source": source,
+        })
+    return jsonify(dem.encode(heights, lats, lons, source, fmt=request.args.get("format", "int16")))
+
+@bp.route("/sim_batch", methods=["POST"])
+def sim_batch():
+    """
+    Evaluate the impact physics over a grid of energies × distances.
+    Expects JSON: {"en": [Mt, ...], "dist": [km, ...]}
+    Returns per-energy crater sizes and (len(en), len(dist)) grids.
+    """
+    data = request.get_json(force=True)
+    try:
+        en = np.asarray(data["en"], dtype=float).ravel()
+        dist = np.asarray(data["dist"], dtype=float).ravel()
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Expected numeric lists 'en' and 'dist'"}), 400
+    if not (np.isfinite(en).all() and (en > 0).all() and np.isfinite(dist).all() and (dist >= 0).all()):
+        return jsonify({"error": "'en' must be positive and 'dist' non-negative, all finite"}), 400
+    if en.size * dist.size > MAX_BATCH_CELLS:
+        return jsonify({"error": f"Grid larger than {MAX_BATCH_CELLS} cells"}), 400
+
+    E = en[:, None] * 4.184e15
+    r = dist[None, :]
+    op = overpressure_batch(E, r)
+    return jsonify({
+        "en": en.tolist(),
+        "dist": dist.tolist(),
+        "crater": crater_batch(E[:, 0]).tolist(),
+        "overpressure": op.tolist(),
+        "wind": wind_ms_batch(op).tolist(),
+        "thermal": thermal_batch(E, r).tolist(),
+        "seismic": seismic_batch(E, r).tolist(),
+    })
+
+@bp.route("/montecarlo", methods=["POST"])
+def monte_carlo():
+    """
+    Percentile bands of impact outcomes under size / density / speed / angle uncertainty.
+    Expects JSON: {"diameter_km": [min, max] | km, "velocity_kms"} or {"neo": NeoWs object},
+                  plus optional "density" (kg/m³), "dist_km", "n", "seed"
+    """
+    data = request.get_json(force=True)
+    try:
+        if data.get("neo"):
+            params = montecarlo.params_from_neo(data["neo"])
+        else:
+            d = data["diameter_km"]
+            d_min, d_max = (d, d) if isinstance(d, (int, float)) else d
+            params = {"diameter_min_km": float(d_min), "diameter_max_km": float(d_max),
+                      "velocity_kms": float(data.get("velocity_kms", 20.0))}
+        density = float(data["density"]) if data.get("density") is not None else None
+        dist = float(data.get("dist_km", 0))
+        n = int(data.get("n", 10_000))
+        seed = int(data["seed"]) if data.get("seed") is not None else None
+    except (KeyError, TypeError, ValueError, IndexError, AttributeError):
+        return jsonify({"error": "Invalid input"}), 400
+    positive = [params["diameter_min_km"], params["diameter_max_km"], params["velocity_kms"]]
+    positive += [density] if density is not None else []
+    if not all(map(math.isfinite, positive + [dist])) or min(positive) <= 0 or dist < 0:
+        return jsonify({"error": "Diameter, velocity and density must be positive and dist_km "
+                                 "non-negative, all finite"}), 400
+    if seed is not None and seed < 0:
+        return jsonify({"error": "Seed must be non-negative"}), 400
+    if not 1 <= n <= Config.MC_MAX_SAMPLES:
+        return jsonify({"error": f"n must be between 1 and {Config.MC_MAX_SAMPLES}"}), 400
+
+    return jsonify({**montecarlo.simulate(**params, n=n, seed=seed, density=density, dist_km=dist),
+                    "inputs": params})
+
+@bp.route("/profile", methods=["POST"])
+def profile():
+    """
+    Damage radii and GeoJSON rings around an impact point.
+    Expects JSON: {"lat", "lon", "en": Mt,
+                   "thresholds": {"overpressure": [[Pa, "label"], ...], ...}  (optional),
+                   "include_profile": bool (optional)}
+    """
+    data = request.get_json(force=True)
+    try:
+        lat = float(data["lat"])
+        lon = float(data["lon"])
+        E = float(data["en"]) * 4.184e15
+        thresholds = DEFAULT_THRESHOLDS
+        if data.get("thresholds"):
+            thresholds = {
+                q: [(float(t[0]), str(t[1])) if isinstance(t, (list, tuple)) else (float(t), f"{q} ≥ {t}")
+                    for t in levels]
+                for q, levels in data["thresholds"].items() if q in DEFAULT_THRESHOLDS
+            }
+    except (KeyError, TypeError, ValueError, IndexError, AttributeError):
+        return jsonify({"error": "Invalid input"}), 400
+    if not all(map(math.isfinite, (lat, lon, E))):
+        return jsonify({"error": "lat, lon and en must be finite"}), 400
+    if E <= 0:
+        return jsonify({"error": "Energy must be positive"}), 400
+
+    prof = radial_profile(E)
+    radii = damage_radii(E, thresholds, prof)
+    out = {"radii": radii, "geojson": damage_geojson(lat, lon, radii)}
+    if data.get("include_profile"):
+        out["profile"] = {k: v.tolist() for k, v in prof.items()}
+    return jsonify(out)
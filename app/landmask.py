@@ -0,0 +1,68 @@
+"""
+Offline land/sea mask.
+
+A bundled 0.1° global raster (1800 × 3600 cells, 1 bit per cell, row 0 at
+90°N, column 0 at 180°W) read through a memory map, so a lookup is one
+byte read with no network access. Built from the 1 km NOAA GLOBE mask
+shipped in the MIT-licensed `global-land-mask` package: a 0.1° cell is
+land when at least half of its 12 × 12 source pixels are land.
+
+    python -m app.landmask build path/to/globe_combined_mask_compressed.npz
+"""
+from pathlib import Path
+
+import numpy as np
+
+RES_DEG = 0.1
+ROWS, COLS = 1800, 3600
+MASK_PATH = Path(__file__).parent / "data" / "landmask_0p1deg.bin"
+
+_bits = None
+
+
+def _mask():
+    global _bits
+    if _bits is None:
+        _bits = np.memmap(MASK_PATH, dtype=np.uint8, mode="r", shape=(ROWS * COLS // 8,))
+    return _bits
+
+
+def available() -> bool:
+    return MASK_PATH.exists()
+
+
+def cell_index(lat, lon):
+    """Flat raster index of the cell containing (lat, lon); arrays allowed."""
+    lat = np.clip(np.asarray(lat, dtype=float), -90, 90)
+    lon = (np.asarray(lon, dtype=float) + 180) % 360
+    row = np.minimum(((90 - lat) / RES_DEG).astype(int), ROWS - 1)
+    col = np.minimum((lon / RES_DEG).astype(int), COLS - 1)
+    return row * COLS + col
+
+
+def is_land(lat, lon):
+    """True where (lat, lon) is land. Scalars in → bool out; arrays → bool array."""
+    idx = cell_index(lat, lon)
+    bit = (_mask()[idx >> 3] >> (7 - (idx & 7))) & 1
+    return bool(bit) if np.ndim(bit) == 0 else bit.astype(bool)
+
+
+def build(globe_npz, out_path=MASK_PATH):
+    """Downsample the 1 km GLOBE water mask to the bundled 0.1° land bitmap."""
+    water = np.load(globe_npz)["mask"]                      # (21600, 43200), True = water
+    f = water.shape[0] // ROWS
+    land = np.empty((ROWS, COLS), dtype=bool)
+    for r in range(ROWS):                                   # row blocks keep memory low
+        block = ~water[r * f:(r + 1) * f].reshape(f, COLS, f)
+        land[r] = block.mean(axis=(0, 2)) >= 0.5
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    np.packbits(land.ravel()).tofile(out_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3 or sys.argv[1] != "build":
+        sys.exit(__doc__)
+    build(sys.argv[2])
+    print(f"wrote {MASK_PATH}")
@@ -0,0 +1,77 @@
+"""
+Shared LLM clients.
+
+One process-wide httpx connection pool (keep-alive, LLM_MAX_CONNECTIONS
+concurrent requests) backs every OpenAI SDK client and LangChain chat
+model, so TLS handshakes and client construction happen once rather than
+per request. Chat models are cached per (model, temperature); prebuilt
+chains are registered by name with chain(name, factory).
+"""
+import threading
+from functools import lru_cache
+
+from app.config import Config
+
+_chains = {}
+_chains_lock = threading.Lock()
+
+
+def timeout_for(model: str) -> float:
+    """Request timeout in seconds: LLM_MODEL_TIMEOUTS entry for `model`, else LLM_TIMEOUT."""
+    for item in Config.LLM_MODEL_TIMEOUTS.split(","):
+        name, _, secs = item.partition("=")
+        if name.strip() == model and secs.strip():
+            return float(secs)
+    return Config.LLM_TIMEOUT
+
+
+@lru_cache(maxsize=None)
+def http_client():
+    """The keep-alive connection pool shared by every client below."""
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=Config.LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=Config.LLM_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(Config.LLM_TIMEOUT, connect=10.0),
+    )
+
+
+@lru_cache(maxsize=None)
+def openai_client():
+    """OpenAI SDK client (chat completions, speech) on the shared pool."""
+    from openai import OpenAI
+    return OpenAI(api_key=Config.OPENAI_API_KEY, http_client=http_client(),
+                  max_retries=Config.LLM_MAX_RETRIES)
+
+
+@lru_cache(maxsize=None)
+def chat_model(model: str = "gpt-3.5-turbo", temperature: float = 0.7):
+    """LangChain chat model on the shared pool, one instance per (model, temperature)."""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        openai_api_key=Config.OPENAI_API_KEY,
+        http_client=http_client(),
+        request_timeout=timeout_for(model),
+        max_retries=Config.LLM_MAX_RETRIES,
+    )
+
+
+def chain(name: str, factory):
+    """The chain registered under `name`, built once by factory() on first use."""
+    built = _chains.get(name)
+    if built is None:
+        with _chains_lock:
+            built = _chains.get(name)
+            if built is None:
+                built = _chains[name] = factory()
+    return built
+
+
+def info() -> dict:
+    return {
+        "max_connections": Config.LLM_MAX_CONNECTIONS,
+        "chat_models": chat_model.cache_info().currsize,
+        "chains": sorted(_chains),
+    }
@@ -0,0 +1,167 @@
+"""
+LLM response cache.
+
+Replies are stored in SQLite (LLM_CACHE_DB, shared by every worker on the
+host) under sha256(endpoint, system prompt, normalized question, context),
+so repeated classroom and demo questions skip the model round-trip.
+
+* Only deterministic calls (temperature 0) are cached, unless the endpoint
+  is listed in LLM_CACHE_OPT_IN.
+* Entries expire after the endpoint's LLM_CACHE_TTLS entry (else LLM_CACHE_TTL);
+  about one write in 1/PRUNE_PROBABILITY also deletes the expired rows.
+* Hits, misses and the model time they saved are counted per endpoint.
+"""
+import hashlib
+import random
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.config import Config
+
+PRUNE_PROBABILITY = 0.01         # chance that a put() also deletes expired entries
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    endpoint   TEXT NOT NULL,
+    reply      TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    endpoint TEXT PRIMARY KEY,
+    hits     INTEGER NOT NULL DEFAULT 0,
+    misses   INTEGER NOT NULL DEFAULT 0,
+    saved_ms REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+@contextmanager
+def _connect():
+    path = Path(Config.LLM_CACHE_DB)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def normalize(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question."""
+    return re.sub(r"\s+", " ", question).strip().lower().rstrip("?!. ")
+
+
+def cache_key(endpoint, system, question, context="") -> str:
+    digest = hashlib.sha256()
+    for part in (endpoint, system, normalize(question), context):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cacheable(endpoint, temperature) -> bool:
+    if not Config.LLM_CACHE_DB:
+        return False
+    opt_in = {e.strip() for e in Config.LLM_CACHE_OPT_IN.split(",") if e.strip()}
+    return temperature == 0 or endpoint in opt_in
+
+
+def ttl_for(endpoint) -> float:
+    for item in Config.LLM_CACHE_TTLS.split(","):
+        name, _, secs = item.partition("=")
+        if name.strip() == endpoint and secs.strip():
+            return float(secs)
+    return Config.LLM_CACHE_TTL
+
+
+def _count(conn, endpoint, hits=0, misses=0, saved_ms=0.0):
+    conn.execute(
+        """
+        INSERT INTO stats (endpoint, hits, misses, saved_ms) VALUES (?, ?, ?, ?)
+        ON CONFLICT(endpoint) DO UPDATE SET
+            hits = hits + excluded.hits, misses = misses + excluded.misses,
+            saved_ms = saved_ms + excluded.saved_ms
+        """,
+        (endpoint, hits, misses, saved_ms),
+    )
+
+
+def get(endpoint, key):
+    """Cached reply or None; counts the hit or miss."""
+    t0 = time.perf_counter()
+    with _connect() as conn:
+        row = conn.execute("SELECT reply, latency_ms FROM responses WHERE key = ? AND expires_at > ?",
+                           (key, time.time())).fetchone()
+        if row:
+            _count(conn, endpoint, hits=1, saved_ms=max(row[1] - 1000 * (time.perf_counter() - t0), 0))
+            return row[0]
+        _count(conn, endpoint, misses=1)
+    return None
+
+
+def put(endpoint, key, reply, latency_ms):
+    if not reply:
+        return
+    with _connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                     (key, endpoint, reply, latency_ms, time.time() + ttl_for(endpoint)))
+        if random.random() < PRUNE_PROBABILITY:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+
+def cached_call(endpoint, temperature, system, question, context, call):
+    """call() → reply text, served from the cache when possible."""
+    if not cacheable(endpoint, temperature):
+        return call()
+    key = cache_key(endpoint, system, question, context)
+    reply = get(endpoint, key)
+    if reply is None:
+        t0 = time.perf_counter()
+        reply = call()
+        put(endpoint, key, reply, 1000 * (time.perf_counter() - t0))
+    return reply
+
+
+def cached_stream(endpoint, temperature, system, question, context, stream):
+    """
+    stream() → iterator of text chunks. A hit replays the cached reply as
+    one chunk; a miss relays the chunks and caches the joined reply once the
+    stream completes.
+    """
+    if not cacheable(endpoint, temperature):
+        yield from stream()
+        return
+    key = cache_key(endpoint, system, question, context)
+    reply = get(endpoint, key)
+    if reply is not None:
+        yield reply
+        return
+    t0 = time.perf_counter()
+    parts = []
+    for chunk in stream():
+        if chunk:
+            parts.append(chunk)
+            yield chunk
+    put(endpoint, key, "".join(parts), 1000 * (time.perf_counter() - t0))
+
+
+def stats() -> dict:
+    with _connect() as conn:
+        rows = conn.execute("SELECT endpoint, hits, misses, saved_ms FROM stats").fetchall()
+        entries = conn.execute("SELECT COUNT(*) FROM responses WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+    return {
+        "entries": entries,
+        "endpoints": {
+            e: {"hits": h, "misses": m, "hit_rate": round(h / (h + m), 4) if h + m else None,
+                "saved_ms": round(s, 1)}
+            for e, h, m, s in rows
+        },
+    }
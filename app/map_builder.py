@@ -1,5 +1,4 @@
-import folium
-from app.geo02 import haversine
+from app.geo02 import haversine_batch
 from pathlib import Path
 
 def create_map(
@@ -7,6 +6,7 @@ def create_map(
     user_lon: float,
     shelters: list[dict],
 ) -> str:
+    import folium                       # heavy; only needed when a map is rendered
 
     # Base map centered on user location
     m = folium.Map(location=[user_lat, user_lon], zoom_start=12)
@@ -19,8 +19,9 @@ def create_map(
     ).add_to(m)
 
     # Shelter markers
-    for s in shelters:
-        dist = haversine(user_lat, user_lon, s["lat"], s["lon"])
+    dists = haversine_batch(user_lat, user_lon,
+                            [s["lat"] for s in shelters], [s["lon"] for s in shelters])
+    for s, dist in zip(shelters, dists):
         color = "green"
         icon = "home"
         folium.Marker(
@@ -30,3 +31,43 @@ def create_map(
         ).add_to(m)
 
     return m._repr_html_()  # Return HTML for iframe
+
+def shelters_geojson(
+    user_lat: float,
+    user_lon: float,
+    shelters: list[dict],
+) -> dict:
+    """
+    Compact FeatureCollection of shelter points with precomputed
+    distance_km, for client-side rendering and marker clustering.
+    """
+    dist = haversine_batch(user_lat, user_lon,
+                           [s["lat"] for s in shelters], [s["lon"] for s in shelters])
+    return {
+        "type": "FeatureCollection",
+        "center": [user_lon, user_lat],
+        "features": [{
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(s["lon"], 6), round(s["lat"], 6)]},
+            "properties": {"name": s["name"], "distance_km": round(float(d), 2)},
+        } for s, d in zip(shelters, dist)],
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.map_builder  → build time and payload, folium HTML vs GeoJSON
+    import json
+    import random
+    import time
+
+    random.seed(0)
+    for count in (10, 1_000, 10_000):
+        shelters = [{"name": f"Shelter {k}", "lat": 37.8 + random.uniform(-0.2, 0.2),
+                     "lon": -122.4 + random.uniform(-0.2, 0.2)} for k in range(count)]
+        t0 = time.perf_counter()
+        html = create_map(37.8, -122.4, shelters)
+        t1 = time.perf_counter()
+        geo = json.dumps(shelters_geojson(37.8, -122.4, shelters), separators=(",", ":"))
+        t2 = time.perf_counter()
+        print(f"{count:>6} shelters: folium {1000 * (t1 - t0):8.1f} ms {len(html) / 1024:8.0f} KiB | "
+              f"geojson {1000 * (t2 - t1):6.1f} ms {len(geo) / 1024:6.0f} KiB")
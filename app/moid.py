@@ -0,0 +1,204 @@
+"""
+Minimum orbit intersection distance (MOID) screening.
+
+The MOID is the closest the two orbits' ellipses come to each other,
+wherever the bodies are on them. For every catalog orbit against Earth's:
+
+1. coarse pass: both orbits sampled at MOID_GRID points in eccentric
+   anomaly (anomaly_to_xyz), all pairwise distances, chunks of objects;
+2. refinement: from the MOID_STARTS closest grid pairs of each object,
+   vectorized trust-region Newton iterations in (E_neo, E_earth) on the
+   squared distance, until the step is below 1e-10 rad.
+
+Earth's orbit is today's from app.ephemeris. Values are memoized per
+element set (and Earth orbit), so a catalog sync only re-screens the
+objects whose elements changed; screen() returns objects ranked by MOID.
+"""
+import threading
+
+import numpy as np
+from app.orbits import anomaly_to_xyz, elements_table, AU_KM
+from app.orbit_cache import element_key
+from app import ephemeris
+
+LD_KM = 384400.0                 # lunar distance
+PHA_MOID_AU = 0.05               # MOID limit for a potentially hazardous asteroid
+MOID_GRID = 72
+MOID_STARTS = 4
+CHUNK = 256                      # objects per coarse-pass block (CHUNK·GRID² distances)
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _xyz(el, E):
+    """(x, y, z) in AU of orbits `el` (tuple of broadcastable arrays) at eccentric anomalies E."""
+    return np.stack(anomaly_to_xyz(*el, E), axis=-1) / AU_KM
+
+
+def moid(table, earth=None, grid=MOID_GRID, starts=MOID_STARTS, tol=1e-10, max_iter=100):
+    """
+    MOID (AU) between every row of an (n, 5) element table and the `earth`
+    orbit (a, e, i, Ω, ω), by default today's.
+    """
+    earth = ephemeris.orbit_elements("Earth") if earth is None else earth
+    table = np.asarray(table, dtype=np.float64).reshape(-1, 5)
+    starts = min(starts, grid * grid)
+    best = np.empty((len(table), starts), dtype=int)
+    E_grid = np.linspace(0, 2 * np.pi, grid, endpoint=False)
+    earth_pts = _xyz(earth, E_grid)                                    # (grid, 3)
+    for lo in range(0, len(table), CHUNK):
+        block = table[lo:lo + CHUNK]
+        el = tuple(block[:, k:k + 1] for k in range(5))
+        pts = _xyz(el, E_grid[None, :])                                # (m, grid, 3)
+        d2 = ((pts * pts).sum(-1)[:, :, None] + (earth_pts * earth_pts).sum(-1)[None, None, :]
+              - 2 * pts @ earth_pts.T).reshape(len(block), -1)             # |p - q|² via one matmul
+        best[lo:lo + len(block)] = np.argpartition(d2, starts - 1, axis=1)[:, :starts]
+    d2 = _refine(np.repeat(table, starts, axis=0), earth, E_grid[best // grid].ravel(),
+                 E_grid[best % grid].ravel(), 2 * np.pi / grid, tol, max_iter)
+    return np.sqrt(d2.reshape(-1, starts).min(axis=1))
+
+
+def _frame(el):
+    """
+    Semi-axes a, b (AU) and perifocal unit vectors P, Q of each orbit, so
+    that r(E) = a (cos E - e) P + b sin E Q. P and Q are the circular-orbit
+    positions at E = 0 and 90° from anomaly_to_xyz.
+    """
+    a, e, i, Omega, omega = (np.asarray(v, dtype=np.float64) for v in el)
+    P = np.stack(anomaly_to_xyz(1, 0, i, Omega, omega, 0), axis=-1) / AU_KM
+    Q = np.stack(anomaly_to_xyz(1, 0, i, Omega, omega, np.pi / 2), axis=-1) / AU_KM
+    return a, a * np.sqrt(1 - e * e), e, P, Q
+
+
+def _point(frame, E):
+    """Position and its first and second derivatives in E."""
+    a, b, e, P, Q = frame
+    c, s = np.cos(E)[..., None], np.sin(E)[..., None]
+    a, b, e = a[..., None], b[..., None], e[..., None]
+    return (a * (c - e) * P + b * s * Q,
+            -a * s * P + b * c * Q,
+            -a * c * P - b * s * Q)
+
+
+def _refine(rows, earth, E1, E2, step, tol, max_iter):
+    """
+    Minimum squared distance from every start (one element row each):
+    Newton steps on f(E1, E2) = |r1 - r2|² inside a trust radius that
+    starts at one grid cell, steepest descent where the Hessian is not
+    positive definite. Converged starts drop out of the active set.
+    """
+    neo = _frame(rows.T)
+    planet = _frame(np.broadcast_to(np.asarray(earth, dtype=np.float64)[:, None], (5, len(rows))))
+    radius = np.full(E1.shape, step)
+    best = np.full(E1.shape, np.inf)
+    active = np.arange(len(E1))
+    for _ in range(max_iter):
+        f1, f2 = (tuple(v[active] for v in fr) for fr in (neo, planet))
+        r1, d1, dd1 = _point(f1, E1[active])
+        r2, d2, dd2 = _point(f2, E2[active])
+        diff = r1 - r2
+        f = (diff * diff).sum(-1)
+        best[active] = f
+        g1, g2 = 2 * (diff * d1).sum(-1), -2 * (diff * d2).sum(-1)
+        h11 = 2 * ((d1 * d1).sum(-1) + (diff * dd1).sum(-1))
+        h22 = 2 * ((d2 * d2).sum(-1) - (diff * dd2).sum(-1))
+        h12 = -2 * (d1 * d2).sum(-1)
+        det = h11 * h22 - h12 * h12
+        newton = (h11 > 0) & (det > 0)
+        safe = np.where(newton, det, 1.0)
+        s1 = np.where(newton, (-h22 * g1 + h12 * g2) / safe, -g1)
+        s2 = np.where(newton, (h12 * g1 - h11 * g2) / safe, -g2)
+        norm = np.hypot(s1, s2)
+        scale = np.minimum(1.0, radius[active] / np.maximum(norm, 1e-300))
+        s1, s2, norm = s1 * scale, s2 * scale, norm * scale
+
+        t1, t2 = E1[active] + s1, E2[active] + s2
+        diff = _point(f1, t1)[0] - _point(f2, t2)[0]
+        f_new = (diff * diff).sum(-1)
+        ok = f_new <= f
+        E1[active] = np.where(ok, t1, E1[active])
+        E2[active] = np.where(ok, t2, E2[active])
+        best[active] = np.where(ok, f_new, f)
+        radius[active] = np.where(ok, np.minimum(2 * radius[active], step), radius[active] / 4)
+        active = active[(norm >= tol) & (radius[active] >= tol)]
+        if not active.size:
+            break
+    return best
+
+
+def moid_cached(table, earth=None) -> np.ndarray:
+    """moid() for each row, computing only element sets not seen before."""
+    earth = ephemeris.orbit_elements("Earth") if earth is None else earth
+    spec = "moid|" + element_key(earth, "")
+    keys = [element_key(row, spec) for row in table]
+    with _memo_lock:
+        values = [_memo.get(k) for k in keys]
+    missing = {}
+    for idx, v in enumerate(values):
+        if v is None:
+            missing.setdefault(keys[idx], idx)
+    if missing:
+        fresh = moid(np.asarray(table)[list(missing.values())], earth)
+        with _memo_lock:
+            _memo.update(zip(missing, map(float, fresh)))
+            if len(_memo) > 2 * len(keys):                             # drop superseded element sets
+                for stale in set(_memo) - set(keys):
+                    del _memo[stale]
+            values = [_memo[k] for k in keys]
+    return np.asarray(values, dtype=float)
+
+
+def _closest_approach_km(obj):
+    try:
+        return min(float(c["miss_distance"]["kilometers"]) for c in obj["close_approach_data"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def screen(neos: list[dict]) -> list[dict]:
+    """Objects with valid elements, closest orbit to Earth's first."""
+    table, valid = elements_table([obj.get("orbital_data", {}) for obj in neos])
+    objs = [o for o, ok in zip(neos, valid) if ok]
+    values = moid_cached(table[valid])
+    rows = []
+    for obj, m in zip(objs, values):
+        km = obj.get("estimated_diameter", {}).get("kilometers", {})
+        neows = obj["orbital_data"].get("minimum_orbit_intersection")
+        rows.append({
+            "id": obj["id"],
+            "name": obj.get("name", ""),
+            "moid_au": round(float(m), 8),
+            "moid_km": round(float(m) * AU_KM, 1),
+            "moid_ld": round(float(m) * AU_KM / LD_KM, 3),
+            "neows_moid_au": float(neows) if neows is not None else None,
+            "closest_approach_km": _closest_approach_km(obj),
+            "diameter_km": (km["estimated_diameter_min"] + km["estimated_diameter_max"]) / 2 if km else None,
+            "is_pha": bool(obj.get("is_potentially_hazardous_asteroid")),
+            "moid_pha": bool(m <= PHA_MOID_AU),
+        })
+    rows.sort(key=lambda r: r["moid_au"])
+    return rows
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 5000
+    table = np.column_stack([rng.uniform(0.8, 3.0, n), rng.uniform(0, 0.7, n), rng.uniform(0, 30, n),
+                             rng.uniform(0, 360, n), rng.uniform(0, 360, n)])
+    t0 = time.perf_counter()
+    values = moid(table)
+    dt = time.perf_counter() - t0
+    print(f"{n} orbits screened in {dt * 1000:.0f} ms ({n / dt:,.0f} orbits/s)")
+
+    # brute-force check on a few orbits: dense 3600 × 3600 grid
+    E = np.linspace(0, 2 * np.pi, 3600, endpoint=False)
+    earth = _xyz(ephemeris.orbit_elements("Earth"), E)
+    worst = -np.inf
+    for row, m in zip(table[:20], values[:20]):
+        pts = _xyz(tuple(row), E)
+        dense = min(np.sqrt(((p - earth) ** 2).sum(-1)).min() for p in pts)
+        worst = max(worst, m - dense)
+    print(f"max excess over a 0.1° brute-force grid: {worst:.2e} AU (negative = refinement beat the grid)")
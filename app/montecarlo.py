@@ -0,0 +1,185 @@
+"""
+Monte Carlo impact uncertainty.
+
+A NEO's size is only known as a range (from its unknown albedo), and its
+density and entry angle not at all, so a single "what if it hits" number
+hides most of the spread. simulate() samples
+
+* diameter: log-uniform over [diameter_min_km, diameter_max_km];
+* density: normal around `density` (kg/m³), clipped to 1000–8000;
+* velocity: normal around `velocity_kms`, clipped to 11.2–72.8 km/s;
+* entry angle: the isotropic-flux distribution p(θ) = sin 2θ (most
+  probable 45°), which scales the cratering energy by sin θ;
+
+pushes every sample through the app.physics batch functions and returns
+percentile bands for energy, crater diameter, seismic magnitude and the
+radii of the app.damage overpressure thresholds.
+
+Samples are drawn in fixed-size chunks (MC_CHUNK), each from its own child
+of SeedSequence(seed), so a seeded run gives the same bands whatever the
+number of workers; runs of more than one chunk are spread over a process
+pool of MC_WORKERS.
+
+    python -m app.montecarlo [n]      # throughput benchmark, samples/sec per core
+"""
+import math
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from app.config import Config
+from app.physics import crater_batch, overpressure_batch, seismic_batch
+from app.damage import DEFAULT_THRESHOLDS, PSI
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DENSITY_RANGE = (1000.0, 8000.0)        # kg/m³, rubble pile to iron
+VELOCITY_RANGE = (11.2, 72.8)           # km/s, escape velocity to retrograde maximum
+R_MIN_KM, R_MAX_KM = 0.01, 1e5          # search bracket for threshold radii
+BISECT_STEPS = 32
+
+_pool = None
+
+
+def _workers() -> int:
+    return Config.MC_WORKERS or os.cpu_count() or 1
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the web process has live threads (LLM pool, SWR refresh)
+        _pool = ProcessPoolExecutor(max_workers=_workers(),
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def sample_inputs(rng, n, diameter_min_km, diameter_max_km, velocity_kms,
+                  density=None, density_sd=1000.0, velocity_sd=2.0):
+    """n draws of (diameter km, density kg/m³, velocity km/s, entry angle °)."""
+    density = Config.RHO_I if density is None else density
+    lo, hi = sorted((diameter_min_km, diameter_max_km))
+    d = np.exp(rng.uniform(math.log(lo), math.log(hi), n))
+    rho = np.clip(rng.normal(density, density_sd, n), *DENSITY_RANGE)
+    v = np.clip(rng.normal(velocity_kms, velocity_sd, n), *VELOCITY_RANGE)
+    angle = np.degrees(np.arcsin(np.sqrt(rng.uniform(0, 1, n))))   # inverse CDF of sin 2θ
+    return d, rho, v, angle
+
+
+def energy_j(diameter_km, density, velocity_kms):
+    """Kinetic energy (J) of a sphere: ½ · ρ · π/6 · D³ · v²."""
+    return 0.5 * density * (math.pi / 6) * (diameter_km * 1000) ** 3 * (velocity_kms * 1000) ** 2
+
+
+def threshold_radius_batch(fn, E_J, thresholds):
+    """
+    Radius (km) at which fn(E, r) falls to each threshold, for every energy:
+    shape (len(E_J), len(thresholds)). fn must decrease with r; found by
+    bisection in log r, all samples at once. R_MIN_KM if the threshold is
+    never reached, R_MAX_KM if it is still exceeded there.
+    """
+    E = np.asarray(E_J, dtype=float)[:, None]
+    t = np.asarray(thresholds, dtype=float)[None, :]
+    lo = np.full((E.shape[0], t.shape[1]), math.log(R_MIN_KM))
+    hi = np.full_like(lo, math.log(R_MAX_KM))
+    for _ in range(BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        above = fn(E, np.exp(mid)) >= t
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    return np.exp(hi)
+
+
+def _run_chunk(seed_seq, n, diameter_min_km, diameter_max_km, velocity_kms, density,
+               dist_km, thresholds):
+    rng = np.random.default_rng(seed_seq)
+    d, rho, v, angle = sample_inputs(rng, n, diameter_min_km, diameter_max_km, velocity_kms, density)
+    E = energy_j(d, rho, v)
+    return {
+        "diameter_km": d.astype(np.float32),
+        "density": rho.astype(np.float32),
+        "velocity_kms": v.astype(np.float32),
+        "angle_deg": angle.astype(np.float32),
+        "energy_mt": (E / 4.184e15).astype(np.float32),
+        "crater_km": crater_batch(E * np.sin(np.radians(angle))).astype(np.float32),
+        "seismic_magnitude": seismic_batch(E, dist_km).astype(np.float32),
+        "overpressure_radius_km": threshold_radius_batch(overpressure_batch, E, thresholds).astype(np.float32),
+    }
+
+
+def bands(values, percentiles=PERCENTILES) -> dict:
+    """{"p5": ..., "p50": ..., "mean": ...} of a 1-D sample."""
+    out = {f"p{p:g}": float(q) for p, q in zip(percentiles, np.percentile(values, percentiles))}
+    out["mean"] = float(np.mean(values))
+    return out
+
+
+def simulate(diameter_min_km, diameter_max_km, velocity_kms, n=10_000, seed=None,
+             density=None, dist_km=0.0, percentiles=PERCENTILES, workers=None):
+    """
+    Percentile bands of impact outcomes over n sampled impactors.
+    seed=None draws fresh entropy; the seed used is returned so the run
+    can be repeated exactly. workers=None uses MC_WORKERS (0 = all cores).
+    """
+    n = int(min(max(n, 1), Config.MC_MAX_SAMPLES))
+    seq = np.random.SeedSequence(seed)
+    chunk = max(Config.MC_CHUNK, 1)
+    sizes = [min(chunk, n - i) for i in range(0, n, chunk)]
+    levels = DEFAULT_THRESHOLDS["overpressure"]
+    args = (diameter_min_km, diameter_max_km, velocity_kms, density, dist_km, [t for t, _ in levels])
+    workers = _workers() if workers is None else workers
+
+    t0 = time.perf_counter()
+    children = seq.spawn(len(sizes))
+    if len(sizes) > 1 and workers > 1:
+        pool = _executor()
+        parts = list(pool.map(_run_chunk, children, sizes, *[[a] * len(sizes) for a in args]))
+    else:
+        parts = [_run_chunk(s, size, *args) for s, size in zip(children, sizes)]
+    samples = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    elapsed = time.perf_counter() - t0
+
+    radii = samples.pop("overpressure_radius_km")
+    out = {k: bands(v, percentiles) for k, v in samples.items()}
+    out["overpressure_radius_km"] = [
+        {"threshold_psi": round(t / PSI, 2), "label": label, **bands(radii[:, i], percentiles)}
+        for i, (t, label) in enumerate(levels)
+    ]
+    return {
+        "n": n,
+        "seed": seq.entropy,
+        "dist_km": dist_km,
+        "percentiles": list(percentiles),
+        "bands": out,
+        "elapsed_ms": round(1000 * elapsed, 1),
+    }
+
+
+def params_from_neo(neo: dict) -> dict:
+    """simulate() keyword arguments for a NeoWs object: its diameter range and approach speed."""
+    km = neo["estimated_diameter"]["kilometers"]
+    approach = (neo.get("close_approach_data") or [{}])[0]
+    velocity = float(approach.get("relative_velocity", {}).get("kilometers_per_second", 20.0))
+    return {
+        "diameter_min_km": float(km["estimated_diameter_min"]),
+        "diameter_max_km": float(km["estimated_diameter_max"]),
+        "velocity_kms": velocity,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    Config.MC_MAX_SAMPLES = max(Config.MC_MAX_SAMPLES, n)
+    simulate(0.11, 0.25, 12.5, n=Config.MC_CHUNK, seed=0, workers=1)     # warm up NumPy
+    for w in sorted({1, _workers()}):
+        if w > 1:
+            simulate(0.11, 0.25, 12.5, n=2 * Config.MC_CHUNK, seed=0, workers=w)   # start the pool
+        r = simulate(0.11, 0.25, 12.5, n=n, seed=42, workers=w)
+        rate = n / (r["elapsed_ms"] / 1000)
+        print(f"{w:>2} worker(s): {n:,} samples in {r['elapsed_ms']:8.1f} ms  "
+              f"{rate:12,.0f} samples/s  {rate / w:12,.0f} samples/s/core")
+    b = r["bands"]
+    print(f"crater km p5/p50/p95: {b['crater_km']['p5']:.2f} / {b['crater_km']['p50']:.2f} / {b['crater_km']['p95']:.2f}")
@@ -1,139 +1,124 @@
-import math, requests, datetime as dt, random, json, os, base64
-import plotly.graph_objs as go
-from flask import Blueprint, render_template, jsonify, request
+import math, threading, datetime as dt
+from flask import Blueprint, render_template, jsonify, request, current_app, Response, abort, send_file, stream_with_context, url_for
 from dotenv import load_dotenv
-
-# ✅ new LangChain imports
-from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
 from app.neo import bp
-
-# ✅ OpenAI SDK v1+
-from openai import OpenAI
+from app.catalog import get_neos
+from app import catalog, moid
+from app.scene_builder import build_traces, build_packed, build_frames, PACKED_MIMETYPE, FRAMES_MIMETYPE
+from app.orbits import julian_date
+from app import ephemeris
+from app.orbit_cache import orbit_cache
+from app.sse import sse_text_stream, sse_response
+from app.llm import chat_model
+from app import tts_cache, llm_cache
 
 load_dotenv()   # load .env variables
 
-API_KEY = "i4qSfG0QQG1E05NrJ8NEr3RyMkmAD7dB83edeElz"   # NASA API key
-BROWSE  = "https://api.nasa.gov/neo/rest/v1/neo/browse?page=0&size=30"
+NEO_COUNT = 30   # objects drawn / described from the local catalog
 
  
 
 
-# --------------------------------------------------
-# --------------  orbital mechanics ----------------
-# --------------------------------------------------
-def kepler_to_xyz(a, e, i, Omega, omega, M):
-    a, e, i, Omega, omega, M = map(float, (a, e, i, Omega, omega, M))
-    i, Omega, omega, M = map(math.radians, [i, Omega, omega, M])
-    a *= 149597870.7          # AU → km
-    E = M if e < 0.8 else math.pi
-    for _ in range(20):
-        E = M + e * math.sin(E)
-    nu = 2 * math.atan2(
-        math.sqrt(1 + e) * math.sin(E / 2),
-        math.sqrt(1 - e) * math.cos(E / 2)
-    )
-    r = a * (1 - e * math.cos(E))
-    cosO, sinO = math.cos(Omega), math.sin(Omega)
-    cosw, sinw = math.cos(omega), math.sin(omega)
-    cosi, sini = math.cos(i), math.sin(i)
-    xp = r * math.cos(nu)
-    yp = r * math.sin(nu)
-    x = (cosO * cosw - sinO * sinw * cosi) * xp + (-cosO * sinw - sinO * cosw * cosi) * yp
-    y = (sinO * cosw + cosO * sinw * cosi) * xp + (-sinO * sinw + cosO * cosw * cosi) * yp
-    z = (sinw * sini) * xp + (cosw * sini) * yp
-    return x, y, z
-
-
-def orbit_trace(el, n=120):
-    a   = el.get("semi_major_axis")
-    e   = el.get("eccentricity")
-    i   = el.get("inclination")
-    Omega = el.get("ascending_node_longitude")
-    omega = el.get("perihelion_argument")
-    if None in (a, e, i, Omega, omega):
-        return [], [], []
-    xs, ys, zs = [], [], []
-    for k in range(n + 1):
-        M = 2 * math.pi * k / n
-        x, y, z = kepler_to_xyz(a, e, i, Omega, omega, M)
-        xs.append(x); ys.append(y); zs.append(z)
-    return xs, ys, zs
-
-
 # --------------------------------------------------
 # --------------  /data route ----------------------
 # --------------------------------------------------
 @bp.route("/data")
 def data():
-    resp = requests.get(BROWSE, params={"api_key": API_KEY}, timeout=15)
-    resp.raise_for_status()
-    neos = resp.json()["near_earth_objects"]
-
-    traces = []
-
-    # Starfield
-    def stars():
-        return [random.randint(-3, 3) * 1e9 for _ in range(300)]
-
-    traces.append(go.Scatter3d(
-        x=stars(), y=stars(), z=stars(),
-        mode="markers", marker=dict(size=1, color="white"),
-        hoverinfo="skip", name="Stars"
-    ))
-
-    # Sun
-    traces.append(go.Scatter3d(
-        x=[0], y=[0], z=[0], mode="markers",
-        marker=dict(size=18, color="#ffd166", line=dict(width=2, color="white")),
-        name="Sun", hovertemplate="Sun<extra></extra>"
-    ))
-
-    # Earth
-    earth_M = 2 * math.pi * (dt.datetime.utcnow().timetuple().tm_yday / 365.25)
-    ex, ey, ez = kepler_to_xyz(1.0, 0.0167, 0, 0, 0, earth_M)
-    traces.append(go.Scatter3d(
-        x=[ex], y=[ey], z=[ez], mode="markers",
-        marker=dict(size=12, color="#3a86ff", line=dict(width=2, color="white")),
-        name="Earth", hovertemplate="Earth<extra></extra>"
-    ))
-
-    # NEOs
-    for obj in neos:
-        el = obj["orbital_data"]
-        xs, ys, zs = orbit_trace(el)
-        if not xs:
-            continue
-        pha = obj["is_potentially_hazardous_asteroid"]
-        color = "#ff006e" if pha else "#8338ec"
-        traces.append(go.Scatter3d(
-            x=xs, y=ys, z=zs, mode="lines",
-            line=dict(width=4, color=color), hoverinfo="skip",
-            name=obj["name"][:30], showlegend=False
-        ))
-        traces.append(go.Scatter3d(
-            x=[xs[0]], y=[ys[0]], z=[zs[0]], mode="markers",
-            marker=dict(size=5, color=color, line=dict(width=1, color="white")),
-            hovertemplate=f"<b>{obj['name']}</b><br>PHA: {'Yes' if pha else 'No'}<extra></extra>",
-            showlegend=False
-        ))
+    """
+    3D scene. ?format=packed|json overrides NEO_WIRE_FORMAT;
+    see scene_builder.build_packed for the binary layout.
+    ?lod=0..3 picks the orbit level of detail (0 = overview, 3 = close-up).
+    """
+    neos = get_neos(NEO_COUNT)
+    lod = min(max(request.args.get("lod", 2, int), 0), 3)
+    fmt = request.args.get("format", current_app.config["NEO_WIRE_FORMAT"])
+    if fmt == "packed":
+        return Response(build_packed(neos, lod=lod), mimetype=PACKED_MIMETYPE)
 
+    traces = build_traces(neos, lod=lod)
     return jsonify({"traces": [t.to_plotly_json() for t in traces]})
 
 
+@bp.route("/frames")
+def frames():
+    """
+    Earth and NEO positions over a time window, for animation in one request.
+    ?start=YYYY-MM-DD (default 0h UTC today) &days=365 &step=1 (days);
+    see scene_builder.build_frames for the binary layout.
+    """
+    try:
+        start = request.args.get("start")
+        start_jd = (julian_date(dt.datetime.fromisoformat(start).replace(tzinfo=dt.timezone.utc).timestamp())
+                    if start else ephemeris.day_jd())
+        days = float(request.args.get("days", 365))
+        step = float(request.args.get("step", 1))
+    except ValueError:
+        return jsonify({"error": "Expected start=YYYY-MM-DD and numeric days, step"}), 400
+    if not (math.isfinite(days) and math.isfinite(step)) or step <= 0 or days < 0:
+        return jsonify({"error": "step must be positive and days non-negative, both finite"}), 400
+    neos = get_neos(NEO_COUNT)
+    bodies = len(neos) + len(ephemeris.PLANETS)
+    if (days / step + 1) * bodies > current_app.config["NEO_FRAMES_MAX_POINTS"]:
+        return jsonify({"error": "Too many frames; increase step or shorten the window"}), 400
+    count = int(days // step) + 1
+    return Response(build_frames(neos, start_jd, step, count), mimetype=FRAMES_MIMETYPE)
+
+
+_threats = (None, [])                 # (catalog version, ranked rows)
+_threats_lock = threading.Lock()
+
+
+@bp.route("/threats")
+def threats():
+    """
+    Catalogued NEOs ranked by MOID with Earth's orbit, closest first.
+    ?limit=N (default 50), ?max_moid_au=X, ?pha=1 for the NeoWs PHA flag only.
+    Recomputed only after the catalog changes (or Earth's orbit, daily).
+    """
+    global _threats
+    with _threats_lock:
+        version = (catalog.version(), ephemeris.day_jd())
+        if _threats[0] != version:
+            _threats = (version, moid.screen(catalog.all_neos()))
+        rows = _threats[1]
+    limit = min(max(request.args.get("limit", 50, int), 1), 1000)
+    max_moid = request.args.get("max_moid_au", type=float)
+    if max_moid is not None:
+        rows = [r for r in rows if r["moid_au"] <= max_moid]
+    if request.args.get("pha") == "1":
+        rows = [r for r in rows if r["is_pha"]]
+    return jsonify({"count": len(rows), "objects": rows[:limit]})
+
+
+@bp.route("/cache-stats")
+def cache_stats():
+    """Hit/miss counters of the orbit-geometry cache."""
+    return jsonify(orbit_cache.info())
+
+
 # --------------------------------------------------
 # --------------  CHATBOT --------------------------
 # --------------------------------------------------
 _KNOWLEDGE = ""
+_knowledge_lock = threading.Lock()
+
+
+def knowledge() -> str:
+    """NEO facts for the chatbot context, built on first use (or by the startup warm-up)."""
+    with _knowledge_lock:
+        if not _KNOWLEDGE:
+            _build_knowledge()
+        return _KNOWLEDGE
 
 
 def _build_knowledge():
-    """Fetch NEO facts once at startup for chatbot context."""
+    """Read NEO facts from the local catalog for chatbot context."""
     global _KNOWLEDGE
     try:
-        resp = requests.get(BROWSE, params={"api_key": API_KEY}, timeout=15)
-        resp.raise_for_status()
-        neos = resp.json()["near_earth_objects"]
+        neos = get_neos(NEO_COUNT)
+        if not neos:
+            raise LookupError("catalog empty")
+        moids = {r["id"]: r["moid_au"] for r in moid.screen(neos)}
         lines = []
         for obj in neos:
             name = obj["name"]
@@ -143,71 +128,105 @@ def _build_knowledge():
             miss = (min([float(close["miss_distance"]["kilometers"])
                         for close in obj["close_approach_data"]])
                     if obj["close_approach_data"] else None)
+            orbit = (f", orbit MOID with Earth ≈ {moids[obj['id']]:.4f} AU"
+                     if obj["id"] in moids else "")
             if miss:
                 lines.append(f"- {name}: diameter ≈ {dia:.2f} km, "
                              f"PHA: {'YES' if pha else 'no'}, "
-                             f"closest pass ≈ {miss/1e6:.1f} M km")
+                             f"closest pass ≈ {miss/1e6:.1f} M km{orbit}")
             else:
                 lines.append(f"- {name}: diameter ≈ {dia:.2f} km, "
                              f"PHA: {'YES' if pha else 'no'}, "
-                             "no close-approach data")
+                             f"no close-approach data{orbit}")
         _KNOWLEDGE = "NEO facts:\n" + "\n".join(lines)
     except Exception:
         _KNOWLEDGE = "NEO facts: (temporarily unavailable)"
 
 
-_build_knowledge()
+def llm():
+    """LangChain chat model from the shared client registry."""
+    return chat_model("gpt-3.5-turbo", 0)
 
-# ✅ LangChain LLM
-llm = ChatOpenAI(
-    model="gpt-3.5-turbo",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
-)
 
 SYSTEM_PROMPT = (
     "You are a friendly space expert. Use only the provided NEO facts to answer. "
     "If a question is outside the data, say so. Keep answers short and clear.\n\n"
-    f"{_KNOWLEDGE}"
 )
 
 
-def ask_neo_chat(human_text: str) -> str:
-    messages = [
-        SystemMessage(content=SYSTEM_PROMPT),
+def _neo_messages(human_text: str):
+    from langchain.schema import SystemMessage, HumanMessage
+    return [
+        SystemMessage(content=SYSTEM_PROMPT + knowledge()),
         HumanMessage(content=human_text)
     ]
-    return llm(messages).content
+
+
+def ask_neo_chat(human_text: str) -> str:
+    return llm_cache.cached_call(
+        "neo_chat", 0, SYSTEM_PROMPT, human_text, knowledge(),
+        lambda: llm()(_neo_messages(human_text)).content,
+    )
+
+
+def stream_neo_chat(human_text: str):
+    """Yield the answer text chunk by chunk as the model produces it (or cached, at once)."""
+    return llm_cache.cached_stream(
+        "neo_chat", 0, SYSTEM_PROMPT, human_text, knowledge(),
+        lambda: (chunk.content for chunk in llm().stream(_neo_messages(human_text))),
+    )
 
 
 @bp.route("/chat", methods=["POST"])
 def chat():
     """
-    Expects JSON: {"message": "string", "want_audio": bool}
-    Returns JSON: {"reply": "string", "reply_audio": base64|None}
+    Expects JSON: {"message": "string", "want_audio": bool, "stream": bool}
+    Returns JSON: {"reply": "string", "reply_audio_url": "/neo/audio/<key>"|None}
+    With "stream": server-sent "token" events, then "done" carrying the same fields.
+    The audio is synthesized when the URL is first fetched, not here.
     """
     data = request.get_json(force=True)
     question = data.get("message", "").strip()
     if not question:
         return jsonify({"reply": "No question received."}), 400
+    want_audio = bool(data.get("want_audio"))
+
+    if data.get("stream"):
+        return sse_response(sse_text_stream(stream_neo_chat(question),
+                                            lambda text: {"reply_audio_url": _audio_url(text, want_audio)}))
 
     answer = ask_neo_chat(question)
+    return jsonify({"reply": answer, "reply_audio_url": _audio_url(answer, want_audio)})
+
+
+def _audio_url(text, want_audio):
+    if not (want_audio and text.strip()):
+        return None
+    try:
+        return url_for("neo.audio", key=tts_cache.register(text))
+    except OSError:
+        return None  # fallback to browser TTS
 
-    audio_b64 = None
-    if data.get("want_audio"):
-        try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            response = client.audio.speech.create(
-                model="gpt-4o-mini-tts",
-                voice="alloy",
-                input=answer
-            )
-            audio_bytes = response.read()
-            audio_b64 = base64.b64encode(audio_bytes).decode()
-        except Exception:
-            pass  # fallback to browser TTS
-
-    return jsonify({"reply": answer, "reply_audio": audio_b64})
+
+@bp.route("/audio/<key>")
+def audio(key):
+    """
+    Speech for a /chat reply. Cached audio is a static file (conditional and
+    range requests); a miss is streamed chunked while it is synthesized.
+    """
+    if not tts_cache.valid_key(key):
+        abort(404)
+    path = tts_cache.cached(key)
+    if path:
+        resp = send_file(path, mimetype=tts_cache.MIMETYPE, conditional=True)
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return resp
+    try:
+        chunks = tts_cache.stream(key)
+    except KeyError:
+        abort(404)
+    return Response(stream_with_context(chunks), mimetype=tts_cache.MIMETYPE,
+                    headers={"Cache-Control": "no-cache"})
 
 
 # --------------------------------------------------
@@ -0,0 +1,125 @@
+"""
+Orbit-geometry cache.
+
+Sampled orbit polylines keyed by a hash of the orbital elements and the
+sample count, stored as compact float32 (3, n+1) arrays. The memory tier is
+an LRU bounded by bytes; an optional disk tier (ORBIT_CACHE_DIR) lets
+workers and restarts share results. Only rows that miss both tiers are
+propagated, in one vectorized call.
+"""
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from app.config import Config
+from app.orbits import orbit_points, adaptive_orbit_points
+
+
+def element_key(elements, n) -> str:
+    """Stable hash of (a, e, i, Ω, ω) plus the sampling spec (count or tolerance)."""
+    raw = ",".join(f"{float(v):.10g}" for v in elements) + f"|{n}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class OrbitCache:
+    def __init__(self, max_bytes=64 * 2**20, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._mem = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    # ---------- single-key tiers ----------
+    def _get(self, key):
+        with self._lock:
+            arr = self._mem.get(key)
+            if arr is not None:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                return arr
+        if self.disk_dir:
+            path = self.disk_dir / f"{key}.npy"
+            try:
+                arr = np.load(path)
+            except (OSError, ValueError):
+                arr = None
+            if arr is not None:
+                self._put(key, arr, write_disk=False)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return arr
+        return None
+
+    def _put(self, key, arr, write_disk=True):
+        with self._lock:
+            if key in self._mem:
+                return
+            self._mem[key] = arr
+            self._bytes += arr.nbytes
+            while self._bytes > self.max_bytes and len(self._mem) > 1:
+                _, old = self._mem.popitem(last=False)
+                self._bytes -= old.nbytes
+                self.stats["evictions"] += 1
+        if write_disk and self.disk_dir:
+            # unique name: workers sharing the directory may fill the same key at once
+            tmp = self.disk_dir / f"{key}.{secrets.token_hex(4)}.tmp.npy"
+            try:
+                np.save(tmp, arr)
+                tmp.replace(self.disk_dir / f"{key}.npy")
+            except OSError:
+                pass                    # the memory tier has it; the disk tier just misses
+            finally:
+                tmp.unlink(missing_ok=True)
+
+    # ---------- batch lookup ----------
+    def points(self, table, n=120, tol_km=None) -> list[np.ndarray]:
+        """
+        Orbit samples for every row of an (n_objects, 5) element table,
+        as float32 (3, count) arrays. Uses n+1 points uniform in mean
+        anomaly, or adaptive sampling when a chord tolerance tol_km is
+        given. Misses are propagated together.
+        """
+        spec = n if tol_km is None else f"tol{tol_km:.6g}"
+        keys = [element_key(row, spec) for row in table]
+        out = [self._get(k) for k in keys]
+        missing = {}
+        for idx, arr in enumerate(out):
+            if arr is None:
+                missing.setdefault(keys[idx], idx)
+        if missing:
+            with self._lock:
+                self.stats["misses"] += len(missing)
+            rows = np.asarray(table)[list(missing.values())]
+            if tol_km is None:
+                fresh = orbit_points(rows, n).astype(np.float32)
+            else:
+                fresh = [p.astype(np.float32) for p in adaptive_orbit_points(rows, tol_km)]
+            computed = dict(zip(missing, fresh))
+            for key, arr in computed.items():
+                self._put(key, arr)
+            out = [computed[k] if arr is None else arr for k, arr in zip(keys, out)]
+        return out
+
+    def info(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round((lookups - self.stats["misses"]) / lookups, 4) if lookups else None,
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+orbit_cache = OrbitCache(
+    max_bytes=Config.ORBIT_CACHE_MAX_MB * 2**20,
+    disk_dir=Config.ORBIT_CACHE_DIR or None,
+)
@@ -0,0 +1,151 @@
+"""
+Vectorized Keplerian orbit propagation.
+
+Every function here works on NumPy arrays so a whole catalogue of objects
+and all of their sample points are solved in one array operation.
+Angles (i, Ω, ω, M) are in degrees, semi-major axis in AU, output in km.
+"""
+import time
+
+import numpy as np
+
+AU_KM = 149597870.7
+
+ELEMENT_KEYS = (
+    "semi_major_axis",
+    "eccentricity",
+    "inclination",
+    "ascending_node_longitude",
+    "perihelion_argument",
+)
+# plus the mean anomaly (°) at the epoch, mean motion (°/day) and epoch (JD) for propagate()
+MOTION_KEYS = ELEMENT_KEYS + ("mean_anomaly", "mean_motion", "epoch_osculation")
+
+
+def solve_kepler(M, e, tol=1e-12, max_iter=30):
+    """
+    Solve Kepler's equation E - e sin E = M for E (radians).
+    M and e broadcast against each other; Newton-Raphson until |dE| < tol.
+    """
+    M = np.remainder(np.asarray(M, dtype=np.float64), 2 * np.pi)
+    e = np.asarray(e, dtype=np.float64)
+    # starting guess from the old solver: M for low e, π for very eccentric orbits
+    E = np.where(e < 0.8, M, np.pi) + np.zeros_like(M)
+    for _ in range(max_iter):
+        dE = (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+        E -= dE
+        if np.max(np.abs(dE), initial=0.0) < tol:
+            break
+    return E
+
+
+def kepler_to_xyz(a, e, i, Omega, omega, M):
+    """
+    Heliocentric ecliptic x, y, z (km) from classical elements.
+    Any argument may be a scalar or an array; the results broadcast.
+    """
+    e = np.asarray(e, dtype=np.float64)
+    E = solve_kepler(np.radians(M), e)
+    return anomaly_to_xyz(a, e, i, Omega, omega, E)
+
+
+def anomaly_to_xyz(a, e, i, Omega, omega, E):
+    """Like kepler_to_xyz, but from the eccentric anomaly E (radians)."""
+    a, e, i, Omega, omega, E = (np.asarray(v, dtype=np.float64)
+                                for v in (a, e, i, Omega, omega, E))
+    i, Omega, omega = np.radians(i), np.radians(Omega), np.radians(omega)
+    nu = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2),
+                        np.sqrt(1 - e) * np.cos(E / 2))
+    r = a * AU_KM * (1 - e * np.cos(E))
+    cosO, sinO = np.cos(Omega), np.sin(Omega)
+    cosw, sinw = np.cos(omega), np.sin(omega)
+    cosi, sini = np.cos(i), np.sin(i)
+    xp = r * np.cos(nu)
+    yp = r * np.sin(nu)
+    x = (cosO * cosw - sinO * sinw * cosi) * xp + (-cosO * sinw - sinO * cosw * cosi) * yp
+    y = (sinO * cosw + cosO * sinw * cosi) * xp + (-sinO * sinw + cosO * cosw * cosi) * yp
+    z = (sinw * sini) * xp + (cosw * sini) * yp
+    return x, y, z
+
+
+def elements_table(orbital_data, keys=ELEMENT_KEYS):
+    """
+    Parse NeoWs `orbital_data` dicts into an (n, len(keys)) float array,
+    by default (a, e, i, Ω, ω). Returns (table, valid_mask); invalid rows
+    are NaN.
+    """
+    table = np.full((len(orbital_data), len(keys)), np.nan)
+    for row, el in enumerate(orbital_data):
+        try:
+            table[row] = [float(el[k]) for k in keys]
+        except (KeyError, TypeError, ValueError):
+            continue
+    valid = ~np.isnan(table).any(axis=1) & (table[:, 1] < 1)
+    return table, valid
+
+
+def julian_date(unix_time=None) -> float:
+    """Julian date of a Unix timestamp (default: now)."""
+    return (time.time() if unix_time is None else unix_time) / 86400.0 + 2440587.5
+
+
+def propagate(table, jd):
+    """
+    Positions (km) at Julian dates `jd` for every row of an (n, 8) table in
+    MOTION_KEYS order, M = M0 + n·(jd − epoch): two-body motion, all
+    objects and times solved in one pass. Returns (n_objects, 3, len(jd)).
+    """
+    table = np.asarray(table, dtype=np.float64).reshape(-1, len(MOTION_KEYS))
+    jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+    a, e, i, Omega, omega, M0, n, epoch = (table[:, k:k + 1] for k in range(len(MOTION_KEYS)))
+    M = M0 + n * (jd[None, :] - epoch)
+    return np.stack(kepler_to_xyz(a, e, i, Omega, omega, M), axis=1)
+
+
+def orbit_points(table, n=120):
+    """
+    Sample n+1 points uniformly in mean anomaly for every row of an
+    (n_objects, 5) element table. Returns an (n_objects, 3, n+1) array.
+    """
+    table = np.asarray(table, dtype=np.float64).reshape(-1, len(ELEMENT_KEYS))
+    M = np.linspace(0.0, 360.0, n + 1)[None, :]
+    a, e, i, Omega, omega = (table[:, k:k + 1] for k in range(len(ELEMENT_KEYS)))
+    x, y, z = kepler_to_xyz(a, e, i, Omega, omega, M)
+    return np.stack([x, y, z], axis=1)
+
+
+# --------------------------------------------------
+# --------------  adaptive (LOD) sampling ----------
+# --------------------------------------------------
+# Chord tolerance per level of detail, in AU (0 = overview … 3 = close-up).
+LOD_TOLERANCE_AU = {0: 2e-2, 1: 5e-3, 2: 1e-3, 3: 2e-4}
+
+
+def sample_count(a, tol_km, n_min=12, n_max=720):
+    """
+    Samples per revolution keeping the chord error below tol_km.
+    Spaced uniformly in eccentric anomaly, the worst sagitta is at
+    perihelion and equals a·ΔE²/8 whatever the eccentricity.
+    """
+    dE = np.sqrt(8 * tol_km / (np.asarray(a, dtype=np.float64) * AU_KM))
+    return np.clip(np.ceil(2 * np.pi / dE), n_min, n_max).astype(int)
+
+
+def adaptive_orbit_points(table, tol_km) -> list[np.ndarray]:
+    """
+    Sample every row of an element table uniformly in eccentric anomaly
+    with just enough points for a chord error of tol_km. Rows sharing a
+    sample count are solved together. Returns (3, count+1) arrays.
+    """
+    table = np.asarray(table, dtype=np.float64).reshape(-1, len(ELEMENT_KEYS))
+    counts = sample_count(table[:, 0], tol_km)
+    out = [None] * len(table)
+    for n in np.unique(counts):
+        rows = np.flatnonzero(counts == n)
+        E = np.linspace(0.0, 2 * np.pi, n + 1)[None, :]
+        a, e, i, Omega, omega = (table[rows, k:k + 1] for k in range(len(ELEMENT_KEYS)))
+        pts = np.stack(anomaly_to_xyz(a, e, i, Omega, omega, E), axis=1)
+        for row, p in zip(rows, pts):
+            out[row] = p
+    return out
+
@@ -1,39 +1,128 @@
 import requests
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import List, Dict
+from app import shelter_index, upstream
+from app.config import Config
+from app.geo02 import geohash_cover, geohash_bbox, haversine_batch
 
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+def fetch_osm_shelters(lat: float, lon: float, radius_km: int = 20) -> List[Dict[str, float]]:
+    """
+    Shelter-like objects inside radius_km kilometres. Served from the
+    offline shelter index when one has been imported; Overpass otherwise
+    (SHELTER_SOURCE = auto | index | overpass).
+    """
+    source = Config.SHELTER_SOURCE
+    if source == "index" or (source == "auto" and shelter_index.available()):
+        return shelter_index.query_radius(lat, lon, radius_km)
+    return fetch_overpass_shelters(lat, lon, radius_km)
 
 
-def fetch_osm_shelters(lat: float, lon: float, radius_km: int = 20) -> List[Dict[str, float]]:
+class ShelterList(list):
+    """Search result; `partial` is True when some tiles failed or timed out and are missing."""
+
+    def __init__(self, shelters=(), failed_tiles=()):
+        super().__init__(shelters)
+        self.failed_tiles = list(failed_tiles)
+        self.partial = bool(self.failed_tiles)
+
+
+# Overpass results are cached per geohash tile: precision 4 (~20 × 40 km)
+# for city-scale searches, precision 3 (~156 km) above TILE_COARSE_KM.
+TILE_COARSE_KM = 50
+
+_tiles: Dict[str, tuple] = {}            # geohash → (fetched_at, shelters)
+_inflight: Dict[str, Future] = {}        # geohash → pending upstream fetch
+_tiles_lock = threading.Lock()
+_tile_pool = ThreadPoolExecutor(max_workers=Config.OVERPASS_CONCURRENCY, thread_name_prefix="overpass")
+
+
+def fetch_overpass_shelters(lat: float, lon: float, radius_km: int = 20) -> ShelterList:
+    """
+    Shelter-like objects inside radius_km kilometres from Overpass, assembled
+    from cached geohash tiles. Missing tiles are fetched in parallel, and
+    concurrent requests for the same tile share one upstream call. Expired
+    tiles are served stale while they refresh in the background.
+    Waits at most OVERPASS_SEARCH_TIMEOUT seconds in total; tiles that
+    failed or are still loading are listed in `failed_tiles` (partial).
     """
-    Query Overpass for shelter-like objects inside radius_km kilometres.
+    precision = 4 if radius_km <= TILE_COARSE_KM else 3
+    tiles = geohash_cover(lat, lon, radius_km, precision)
+    futures = [_tile_future(gh) for gh in tiles]
+    deadline = time.monotonic() + Config.OVERPASS_SEARCH_TIMEOUT
+
+    found: Dict[str, Dict] = {}
+    failed = []
+    for gh, fut in zip(tiles, futures):
+        try:
+            for s in fut.result(timeout=max(deadline - time.monotonic(), 0)):
+                found[s["id"]] = s
+        except (requests.RequestException, ValueError, FutureTimeout):
+            failed.append(gh)  # not cached; a late tile still lands in the cache for next time
+
+    shelters = list(found.values())
+    if not shelters:
+        return ShelterList(failed_tiles=failed)
+    dist = haversine_batch(lat, lon, [s["lat"] for s in shelters], [s["lon"] for s in shelters])
+    return ShelterList([shelters[k] for k in dist.argsort() if dist[k] <= radius_km], failed)
+
+
+def _tile_future(gh: str) -> Future:
+    """Cached (possibly stale) tile as a finished future, the in-flight fetch, or a new one."""
+    with _tiles_lock:
+        hit = _tiles.get(gh)
+        age = time.time() - hit[0] if hit else None
+        fut = _inflight.get(gh)
+        if fut is None and (hit is None or age >= Config.OVERPASS_TILE_TTL):
+            fut = _inflight[gh] = _tile_pool.submit(_fetch_tile, gh)
+        if hit and age < Config.OVERPASS_TILE_TTL + Config.OVERPASS_TILE_STALE:
+            done = Future()
+            done.set_result(hit[1])
+            return done
+        return fut
+
+
+def _fetch_tile(gh: str) -> List[Dict[str, float]]:
+    try:
+        shelters = _overpass_bbox(*geohash_bbox(gh))
+        with _tiles_lock:
+            _tiles[gh] = (time.time(), shelters)
+        return shelters
+    finally:
+        with _tiles_lock:
+            _inflight.pop(gh, None)
+
+
+def _overpass_bbox(south: float, west: float, north: float, east: float) -> List[Dict[str, float]]:
     """
-    radius_m = int(radius_km * 1000)
+    Query Overpass for shelter-like objects inside one bounding box.
+    Raises requests.RequestException on failure so the tile is not cached.
+    """
+    bbox = f"{south},{west},{north},{east}"
 
     # Overpass QL: nodes, ways and relations tagged as shelters
     query = f"""
-    [out:json][timeout:30];
+    [out:json][timeout:{Config.OVERPASS_TILE_TIMEOUT}];
     (
-      node["emergency"="shelter"](around:{radius_m},{lat},{lon});
-      node["amenity"="shelter"](around:{radius_m},{lat},{lon});
-      node["shelter"="yes"](around:{radius_m},{lat},{lon});
-      way["emergency"="shelter"](around:{radius_m},{lat},{lon});
-      relation["emergency"="shelter"](around:{radius_m},{lat},{lon});
+      node["emergency"="shelter"]({bbox});
+      node["amenity"="shelter"]({bbox});
+      node["shelter"="yes"]({bbox});
+      way["emergency"="shelter"]({bbox});
+      relation["emergency"="shelter"]({bbox});
     );
     out center;
     """
 
-    try:
-        response = requests.post(
-            OVERPASS_URL,
-            data={"data": query},
-            timeout=35
-        )
-        response.raise_for_status()
-    except requests.RequestException:
-        # Logged by caller if needed; fail silently for user
-        return []
+    response = upstream.request(
+        "POST",
+        Config.OVERPASS_URL,
+        data={"data": query},
+        timeout=Config.OVERPASS_TILE_TIMEOUT + 5,   # the server-side timeout plus transfer
+        retries=Config.OVERPASS_TILE_RETRIES,
+        idempotent=True,     # a read-only query; safe to retry
+    )
 
     elements = response.json().get("elements", [])
     shelters: List[Dict[str, float]] = []
@@ -50,6 +139,6 @@ def fetch_osm_shelters(lat: float, lon: float, radius_km: int = 20) -> List[Dict
                 continue
             lat_el, lon_el = center["lat"], center["lon"]
 
-        shelters.append({"name": name, "lat": lat_el, "lon": lon_el})
+        shelters.append({"id": f"{el['type']}/{el['id']}", "name": name, "lat": lat_el, "lon": lon_el})
 
     return shelters
\ No newline at end of file
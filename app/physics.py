@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from app.config import Config as C
 
 def overpressure(E_J, r_km):
@@ -56,3 +57,37 @@ def seismic(E_J, r_km):
     else:
         att = 1.66 * math.log10(r_km) - 6.399
     return max(M0 - att, 0)  # magnitude cannot be negative
+
+
+# ---------- batch (array) versions ----------
+# Same formulas, caps and branches as above, evaluated element-wise over
+# NumPy arrays; inputs broadcast against each other (e.g. E[:, None], r[None, :]).
+
+def overpressure_batch(E_J, r_km):
+    E_J, r_km = np.asarray(E_J, dtype=float), np.asarray(r_km, dtype=float)
+    r_m = np.maximum(r_km * 1000, 100)
+    p = 75000 * (290 / r_m) ** 1.3 * ((E_J / C.K_t) ** (1 / 3))
+    return np.maximum(0, np.minimum(p, 5e6))
+
+def wind_ms_batch(Pa):
+    v = np.sqrt(np.maximum(np.asarray(Pa, dtype=float), 0) / C.PO)
+    return np.minimum(v, 200)
+
+def thermal_batch(E_J, r_km):
+    E_J, r_km = np.asarray(E_J, dtype=float), np.asarray(r_km, dtype=float)
+    r_m = np.maximum(r_km * 1000, 100)
+    flux = 0.01 * E_J / (4 * math.pi * r_m ** 2)
+    return np.minimum(flux, 1e7)
+
+def crater_batch(E_J):
+    E_Mt = np.asarray(E_J, dtype=float) / 4.184e15
+    return 1.0 * E_Mt ** (1 / 3)
+
+def seismic_batch(E_J, r_km):
+    E_J, r_km = np.asarray(E_J, dtype=float), np.asarray(r_km, dtype=float)
+    M0 = 0.67 * np.log10(E_J) - 5.87
+    r_log = np.log10(np.maximum(r_km, 700))  # only used on the r >= 700 branch
+    att = np.where(r_km < 60, 0.0238 * r_km,
+          np.where(r_km < 700, 0.0048 * r_km - 1.1644,
+                   1.66 * r_log - 6.399))
+    return np.where(r_km <= 0, M0 + 1.0, np.maximum(M0 - att, 0))
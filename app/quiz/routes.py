@@ -1,13 +1,10 @@
 from flask import render_template, jsonify
 from app.quiz import bp
-import requests
+from app.catalog import get_neos
 from datetime import datetime, timedelta
 
-# YOUR NASA API KEY - HARDCODED DIRECTLY
-NASA_API_KEY = "i4qSfG0QQG1E05NrJ8NEr3RyMkmAD7dB83edeElz"
-
-# NASA API endpoints
-NEO_BROWSE = "https://api.nasa.gov/neo/rest/v1/neo/browse?page=0&size=10"
+# number of catalogued NEOs served to the quiz
+NEO_COUNT = 10
 
 # Simulated Impacter 25 asteroid
 IMPACTER_25 = {
@@ -59,11 +56,7 @@ def solar2():
 @bp.route('/api/asteroids')
 def get_asteroids():
     try:
-        params = {'api_key': NASA_API_KEY}  # Using hardcoded key
-        response = requests.get(NEO_BROWSE, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        asteroids = data.get('near_earth_objects', [])
+        asteroids = get_neos(NEO_COUNT)
         asteroids.append(IMPACTER_25)
         return jsonify(asteroids)
     except Exception as e:
@@ -0,0 +1,120 @@
+"""
+Shelter search result store.
+
+Each /shelters/generate result (centre, shelters and, once built, the
+folium HTML) is kept under a random id. The memory tier is an LRU bounded
+by bytes; an optional disk tier (SHELTER_STORE_DIR) shared by all workers
+lets any process serve a download or a chat question for any id. Disk
+entries older than max_age seconds are pruned.
+"""
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.config import Config
+
+
+class ResultStore:
+    def __init__(self, max_bytes=32 * 2**20, disk_dir=None, max_age=24 * 3600):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._mem = OrderedDict()         # id → (record, size)
+        self._bytes = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _valid(result_id) -> bool:
+        return isinstance(result_id, str) and len(result_id) == 32 and all(c in "0123456789abcdef" for c in result_id)
+
+    def _remember(self, result_id, record):
+        size = len(json.dumps(record))
+        with self._lock:
+            old = self._mem.pop(result_id, None)
+            if old:
+                self._bytes -= old[1]
+            self._mem[result_id] = (record, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._mem) > 1:
+                _, (_, dropped) = self._mem.popitem(last=False)
+                self._bytes -= dropped
+                self.stats["evictions"] += 1
+
+    def _write(self, result_id, record):
+        tmp = self.disk_dir / f"{result_id}.{secrets.token_hex(4)}.tmp"
+        tmp.write_text(json.dumps(record), encoding="utf-8")
+        tmp.replace(self.disk_dir / f"{result_id}.json")
+        self._puts += 1
+        if self._puts % 64 == 0:
+            self._prune()
+
+    def _prune(self):
+        cutoff = time.time() - self.max_age
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    # ---------- public API ----------
+    def put(self, record: dict) -> str:
+        """Store a JSON-serializable record; returns its new id."""
+        result_id = secrets.token_hex(16)
+        self.update(result_id, record)
+        return result_id
+
+    def update(self, result_id: str, record: dict):
+        self._remember(result_id, record)
+        if self.disk_dir:
+            self._write(result_id, record)
+
+    def get(self, result_id: str):
+        """The record stored under result_id, or None if unknown or expired."""
+        if not self._valid(result_id):
+            return None
+        with self._lock:
+            hit = self._mem.get(result_id)
+            if hit:
+                self._mem.move_to_end(result_id)
+                self.stats["hits"] += 1
+                return hit[0]
+        if self.disk_dir:
+            path = self.disk_dir / f"{result_id}.json"
+            try:
+                fresh = time.time() - path.stat().st_mtime < self.max_age
+                record = json.loads(path.read_text(encoding="utf-8")) if fresh else None
+            except (OSError, ValueError):
+                record = None
+            if record is not None:
+                self._remember(result_id, record)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return record
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._mem),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+shelter_results = ResultStore(
+    max_bytes=Config.SHELTER_STORE_MAX_MB * 2**20,
+    disk_dir=Config.SHELTER_STORE_DIR or None,
+    max_age=Config.SHELTER_STORE_TTL,
+)
@@ -0,0 +1,215 @@
+import json
+import random
+import struct
+import numpy as np
+from app.orbits import elements_table, propagate, AU_KM, LOD_TOLERANCE_AU, MOTION_KEYS
+from app.orbit_cache import orbit_cache
+from app import ephemeris
+
+PACKED_VERSION = 1
+PACKED_MIMETYPE = "application/vnd.planetwatch.neo-scene"
+FRAMES_VERSION = 1
+FRAMES_MIMETYPE = "application/vnd.planetwatch.neo-frames"
+
+# planets drawn besides Earth; the outer ones would dwarf the NEO orbits
+SCENE_PLANETS = {"Mercury": "#b0b0b0", "Venus": "#e9c46a", "Mars": "#e76f51"}
+
+
+def _earth_xyz():
+    return ephemeris.position("Earth")
+
+
+def _neo_orbits(neos, n, lod):
+    """
+    (objects with valid elements, float32 (3, count) orbit samples for each).
+    lod=None keeps n+1 uniform mean-anomaly samples; otherwise the density
+    follows the chord tolerance of that level of detail.
+    """
+    table, valid = elements_table([obj["orbital_data"] for obj in neos])
+    tol_km = None if lod is None else LOD_TOLERANCE_AU[lod] * AU_KM
+    points = orbit_cache.points(table[valid], n, tol_km)
+    return [o for o, ok in zip(neos, valid) if ok], points
+
+
+def _motion(objs):
+    """(n, 8) MOTION_KEYS table and valid mask: objects that can be propagated in time."""
+    return elements_table([obj["orbital_data"] for obj in objs], MOTION_KEYS)
+
+
+def _positions_now(objs):
+    """
+    Each object's [x, y, z] (km) at 0h UTC today, the epoch of the planet
+    positions, or None without epoch / mean motion.
+    """
+    table, valid = _motion(objs)
+    out = [None] * len(objs)
+    if valid.any():
+        pos = propagate(table[valid], ephemeris.day_jd())[:, :, 0]
+        for idx, p in zip(np.flatnonzero(valid), pos):
+            out[idx] = [float(v) for v in p]
+    return out
+
+
+def build_traces(neos: list[dict], n: int = 120, lod: int | None = None) -> list:
+    """
+    Build the plotly traces for the /neo/data 3D scene
+    (starfield, Sun, Earth and one orbit + marker per NEO).
+    """
+    import plotly.graph_objs as go      # only the legacy JSON format needs plotly
+
+    traces = []
+
+    # Starfield
+    def stars():
+        return [random.randint(-3, 3) * 1e9 for _ in range(300)]
+
+    traces.append(go.Scatter3d(
+        x=stars(), y=stars(), z=stars(),
+        mode="markers", marker=dict(size=1, color="white"),
+        hoverinfo="skip", name="Stars"
+    ))
+
+    # Sun
+    traces.append(go.Scatter3d(
+        x=[0], y=[0], z=[0], mode="markers",
+        marker=dict(size=18, color="#ffd166", line=dict(width=2, color="white")),
+        name="Sun", hovertemplate="Sun<extra></extra>"
+    ))
+
+    # Earth
+    ex, ey, ez = _earth_xyz()
+    traces.append(go.Scatter3d(
+        x=[ex], y=[ey], z=[ez], mode="markers",
+        marker=dict(size=12, color="#3a86ff", line=dict(width=2, color="white")),
+        name="Earth", hovertemplate="Earth<extra></extra>"
+    ))
+    for name, color in SCENE_PLANETS.items():
+        px, py, pz = ephemeris.position(name)
+        traces.append(go.Scatter3d(
+            x=[px], y=[py], z=[pz], mode="markers",
+            marker=dict(size=8, color=color, line=dict(width=1, color="white")),
+            name=name, hovertemplate=f"{name}<extra></extra>"
+        ))
+
+    # NEOs — cached orbits reused, the rest solved in one (n_objects × n+1) pass
+    objs, points = _neo_orbits(neos, n, lod)
+    for obj, (xs, ys, zs), pos in zip(objs, (p.tolist() for p in points), _positions_now(objs)):
+        pha = obj["is_potentially_hazardous_asteroid"]
+        px, py, pz = pos or (xs[0], ys[0], zs[0])
+        color = "#ff006e" if pha else "#8338ec"
+        traces.append(go.Scatter3d(
+            x=xs, y=ys, z=zs, mode="lines",
+            line=dict(width=4, color=color), hoverinfo="skip",
+            name=obj["name"][:30], showlegend=False
+        ))
+        traces.append(go.Scatter3d(
+            x=[px], y=[py], z=[pz], mode="markers",
+            marker=dict(size=5, color=color, line=dict(width=1, color="white")),
+            hovertemplate=f"<b>{obj['name']}</b><br>PHA: {'Yes' if pha else 'No'}<extra></extra>",
+            showlegend=False
+        ))
+
+    return traces
+
+
+def build_packed(neos: list[dict], n: int = 120, lod: int | None = None) -> bytes:
+    """
+    Compact binary form of the /neo/data scene; the client builds the traces.
+
+    Layout (little-endian):
+        uint32  header length H
+        H bytes UTF-8 JSON header, space-padded to a 4-byte boundary:
+                {"version", "earth": [x, y, z], "planets": [{"name", "color", "pos"}, ...],
+                 "objects": [{"name", "pha", "count", "pos": [x, y, z] | null}, ...]}
+        float32 coordinates, per object: x[count], y[count], z[count]
+    Starfield and Sun are drawn by the client; "pos" is the object's current
+    position (null if it cannot be propagated).
+    """
+    objs, points = _neo_orbits(neos, n, lod)
+    header = json.dumps({
+        "version": PACKED_VERSION,
+        "earth": _earth_xyz(),
+        "planets": [{"name": name, "color": color, "pos": ephemeris.position(name)}
+                    for name, color in SCENE_PLANETS.items()],
+        "objects": [{"name": o["name"], "pha": bool(o["is_potentially_hazardous_asteroid"]),
+                     "count": int(p.shape[1]), "pos": pos}
+                    for o, p, pos in zip(objs, points, _positions_now(objs))],
+    }, separators=(",", ":")).encode()
+    header += b" " * (-(4 + len(header)) % 4)
+    coords = np.concatenate([p.ravel() for p in points]) if points else np.empty(0, np.float32)
+    return struct.pack("<I", len(header)) + header + coords.astype("<f4").tobytes()
+
+
+def build_frames(neos: list[dict], start_jd: float, step_days: float, count: int) -> bytes:
+    """
+    Positions of the eight planets (app.ephemeris) and every NEO at `count`
+    times start_jd + k·step_days, each set in one vectorized pass, for
+    client-side animation.
+
+    Layout (little-endian):
+        uint32  header length H
+        H bytes UTF-8 JSON header, space-padded to a 4-byte boundary:
+                {"version", "start_jd", "step_days", "frames",
+                 "bodies": [{"name", "kind": "planet"|"neo", "pha"}, ...]}
+        float32 positions (km), frame-major: frames × bodies × (x, y, z)
+    """
+    table, valid = _motion(neos)
+    objs = [o for o, ok in zip(neos, valid) if ok]
+    jd = start_jd + step_days * np.arange(count)
+    pos = np.concatenate([ephemeris.positions(jd), propagate(table[valid], jd)])
+    pos = pos.transpose(2, 0, 1)                              # (frames, bodies, 3)
+    header = json.dumps({
+        "version": FRAMES_VERSION,
+        "start_jd": start_jd,
+        "step_days": step_days,
+        "frames": count,
+        "bodies": [{"name": name, "kind": "planet", "pha": False} for name in ephemeris.PLANETS]
+                  + [{"name": o["name"], "kind": "neo", "pha": bool(o["is_potentially_hazardous_asteroid"])}
+                     for o in objs],
+    }, separators=(",", ":")).encode()
+    header += b" " * (-(4 + len(header)) % 4)
+    return struct.pack("<I", len(header)) + header + pos.astype("<f4").tobytes()
+
+
+if __name__ == "__main__":
+    # python -m app.scene_builder  → /neo/data build time and payload vs object count
+    import time
+    from app.orbits import orbit_points
+
+    rng = np.random.default_rng(0)
+
+    def fake_neos(count):
+        return [{
+            "name": f"({k}) synthetic",
+            "is_potentially_hazardous_asteroid": bool(k % 7 == 0),
+            "orbital_data": {
+                "semi_major_axis": str(rng.uniform(0.8, 3.0)),
+                "eccentricity": str(rng.uniform(0.0, 0.95)),
+                "inclination": str(rng.uniform(0.0, 40.0)),
+                "ascending_node_longitude": str(rng.uniform(0.0, 360.0)),
+                "perihelion_argument": str(rng.uniform(0.0, 360.0)),
+            },
+        } for k in range(count)]
+
+    for count in (30, 1_000, 10_000):
+        neos = fake_neos(count)
+        table, valid = elements_table([o["orbital_data"] for o in neos])
+        t0 = time.perf_counter()
+        orbit_points(table[valid])
+        t1 = time.perf_counter()
+        traces = build_traces(neos)          # orbit cache is warm from here on
+        body = json.dumps({"traces": [t.to_plotly_json() for t in traces]})
+        t2 = time.perf_counter()
+        packed = build_packed(neos)
+        t3 = time.perf_counter()
+        print(f"{count:>6} objects: propagate {1000 * (t1 - t0):8.1f} ms | "
+              f"json {1000 * (t2 - t1):8.1f} ms {len(body) / 1024:9.0f} KiB | "
+              f"packed {1000 * (t3 - t2):7.1f} ms {len(packed) / 1024:8.0f} KiB")
+
+    # vertices and packed payload per level of detail (10k objects)
+    for lod in [None, *LOD_TOLERANCE_AU]:
+        _, points = _neo_orbits(neos, 120, lod)
+        vertices = sum(p.shape[1] for p in points)
+        packed = build_packed(neos, lod=lod)
+        label = "fixed n=120" if lod is None else f"lod {lod} ({LOD_TOLERANCE_AU[lod]:g} AU)"
+        print(f"{label:>18}: {vertices:>9} vertices | packed {len(packed) / 1024:8.0f} KiB")
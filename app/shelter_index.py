@@ -0,0 +1,199 @@
+"""
+Offline shelter index.
+
+Shelter points imported from a local OSM extract are stored as a directory
+of .npy columns sorted by a 0.5° grid cell, memory-mapped on load. A
+radius query slices the covering cells with searchsorted and filters the
+candidates with a vectorized haversine, so it takes milliseconds and needs
+no network.
+
+    python -m app.shelter_index import-geojson shelters.geojson
+    python -m app.shelter_index import-pbf region-latest.osm.pbf      (needs pyosmium)
+    python -m app.shelter_index refresh LAT LON RADIUS_KM              (merge Overpass results)
+"""
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+from app.config import Config
+from app.geo02 import haversine_batch
+
+CELL_DEG = 0.5
+_COLS = int(360 / CELL_DEG)
+EARTH_R = 6371
+
+_index = None
+
+
+def is_shelter(tags: dict) -> bool:
+    """Same tag filter as the Overpass query in app/osm.py."""
+    return (tags.get("emergency") == "shelter" or tags.get("amenity") == "shelter"
+            or tags.get("shelter") == "yes")
+
+
+def shelter_name(tags: dict) -> str:
+    return tags.get("name") or tags.get("ref") or "Unnamed shelter"
+
+
+def _cell(lat, lon):
+    row = np.minimum(np.floor((np.asarray(lat) + 90) / CELL_DEG).astype(np.int64), int(180 / CELL_DEG) - 1)
+    col = np.floor((np.asarray(lon) + 180) / CELL_DEG).astype(np.int64) % _COLS
+    return row * _COLS + col
+
+
+# --------------------------------------------------
+# --------------  storage --------------------------
+# --------------------------------------------------
+def save(shelters: list[dict], index_dir=None) -> int:
+    """Write shelters ({id, name, lat, lon}) as a cell-sorted index; dedupes by id."""
+    global _index
+    index_dir = Path(index_dir or Config.SHELTER_INDEX_DIR)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    unique = list({s["id"]: s for s in shelters}.values())
+    lat = np.array([s["lat"] for s in unique], dtype=np.float64)
+    lon = np.array([s["lon"] for s in unique], dtype=np.float64)
+    cell = _cell(lat, lon)
+    order = np.argsort(cell, kind="stable")
+    np.save(index_dir / "cell.npy", cell[order])
+    np.save(index_dir / "lat.npy", lat[order])
+    np.save(index_dir / "lon.npy", lon[order])
+    np.save(index_dir / "name.npy", np.array([unique[k]["name"] for k in order], dtype=str))
+    np.save(index_dir / "id.npy", np.array([unique[k]["id"] for k in order], dtype=str))
+    _index = None
+    return len(unique)
+
+
+def load(index_dir=None):
+    """Memory-mapped index columns, or None if no index has been imported."""
+    global _index
+    if _index is None:
+        index_dir = Path(index_dir or Config.SHELTER_INDEX_DIR)
+        if not (index_dir / "cell.npy").exists():
+            return None
+        _index = {k: np.load(index_dir / f"{k}.npy", mmap_mode="r")
+                  for k in ("cell", "lat", "lon", "name", "id")}
+    return _index
+
+
+def available() -> bool:
+    return load() is not None
+
+
+def all_shelters() -> list[dict]:
+    idx = load()
+    if idx is None:
+        return []
+    return [{"id": str(i), "name": str(n), "lat": float(a), "lon": float(o)}
+            for i, n, a, o in zip(idx["id"], idx["name"], idx["lat"], idx["lon"])]
+
+
+# --------------------------------------------------
+# --------------  queries --------------------------
+# --------------------------------------------------
+def query_radius(lat: float, lon: float, radius_km: float) -> list[dict]:
+    """Shelters within radius_km of (lat, lon), nearest first."""
+    idx = load()
+    if idx is None:
+        return []
+    dlat = math.degrees(radius_km / EARTH_R)
+    lat_lo, lat_hi = max(lat - dlat, -90), min(lat + dlat, 90)
+    coslat = min(math.cos(math.radians(lat_lo)), math.cos(math.radians(lat_hi)))
+    dlon = 180 if coslat <= 1e-6 else min(math.degrees(radius_km / (EARTH_R * coslat)), 180)
+
+    rows = range(int((lat_lo + 90) // CELL_DEG), int(min(lat_hi + 90, 180 - 1e-9) // CELL_DEG) + 1)
+    col_lo = int(math.floor((lon - dlon + 180) / CELL_DEG))
+    col_hi = int(math.floor((lon + dlon + 180) / CELL_DEG))
+    cols = range(_COLS) if col_hi - col_lo + 1 >= _COLS else [c % _COLS for c in range(col_lo, col_hi + 1)]
+
+    cells = np.array(sorted(r * _COLS + c for r in rows for c in cols), dtype=np.int64)
+    start = np.searchsorted(idx["cell"], cells, side="left")
+    stop = np.searchsorted(idx["cell"], cells, side="right")
+    cand = np.concatenate([np.arange(a, b) for a, b in zip(start, stop)] or [np.empty(0, int)])
+    if cand.size == 0:
+        return []
+
+    dist = haversine_batch(lat, lon, idx["lat"][cand], idx["lon"][cand])
+    keep = dist <= radius_km
+    cand, dist = cand[keep], dist[keep]
+    order = np.argsort(dist)
+    return [{"id": str(idx["id"][k]), "name": str(idx["name"][k]),
+             "lat": float(idx["lat"][k]), "lon": float(idx["lon"][k])}
+            for k in cand[order]]
+
+
+# --------------------------------------------------
+# --------------  importers ------------------------
+# --------------------------------------------------
+def read_geojson(path) -> list[dict]:
+    """Shelters from a GeoJSON FeatureCollection (points, or polygon centroids)."""
+    with open(path, encoding="utf-8") as fh:
+        features = json.load(fh).get("features", [])
+    shelters = []
+    for k, f in enumerate(features):
+        props = f.get("properties") or {}
+        tags = props.get("tags", props)
+        if not is_shelter(tags):
+            continue
+        geom = f.get("geometry") or {}
+        coords = np.asarray(_flatten(geom.get("coordinates", [])), dtype=float).reshape(-1, 2)
+        if coords.size == 0:
+            continue
+        lon, lat = coords.mean(axis=0)
+        osm_id = f.get("id") or props.get("@id") or props.get("id") or f"feature/{k}"
+        shelters.append({"id": str(osm_id), "name": shelter_name(tags), "lat": float(lat), "lon": float(lon)})
+    return shelters
+
+
+def _flatten(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        return [coords[:2]]
+    return [p for c in coords for p in _flatten(c)]
+
+
+def read_pbf(path) -> list[dict]:
+    """Shelter nodes and ways (way centroid) from an OSM PBF extract."""
+    try:
+        import osmium
+    except ImportError as e:
+        raise RuntimeError("PBF import needs pyosmium: pip install osmium") from e
+
+    shelters = []
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, n):
+            tags = dict(n.tags)
+            if is_shelter(tags):
+                shelters.append({"id": f"node/{n.id}", "name": shelter_name(tags),
+                                 "lat": n.location.lat, "lon": n.location.lon})
+
+        def way(self, w):
+            tags = dict(w.tags)
+            if not is_shelter(tags):
+                return
+            pts = [(nd.lat, nd.lon) for nd in w.nodes if nd.location.valid()]
+            if pts:
+                lat, lon = np.mean(pts, axis=0)
+                shelters.append({"id": f"way/{w.id}", "name": shelter_name(tags),
+                                 "lat": float(lat), "lon": float(lon)})
+
+    Handler().apply_file(str(path), locations=True)
+    return shelters
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else (None, [])
+    if cmd == "import-geojson" and len(args) == 1:
+        print(f"indexed {save(read_geojson(args[0]))} shelters")
+    elif cmd == "import-pbf" and len(args) == 1:
+        print(f"indexed {save(read_pbf(args[0]))} shelters")
+    elif cmd == "refresh" and len(args) == 3:
+        from app.osm import fetch_overpass_shelters
+        fresh = fetch_overpass_shelters(*map(float, args))
+        if fresh.partial:
+            sys.exit(f"{len(fresh.failed_tiles)} Overpass tile(s) failed; index left unchanged, try again")
+        print(f"indexed {save(all_shelters() + fresh)} shelters ({len(fresh)} from Overpass)")
+    else:
+        sys.exit(__doc__)
@@ -1,19 +1,22 @@
-from flask import Blueprint, render_template, request, jsonify, send_file, abort
+from flask import Blueprint, render_template, request, jsonify, send_file, abort, session
 from app.osm import fetch_osm_shelters
-from app.map_builder import create_map
+from app.map_builder import create_map, shelters_geojson
 from app.chatbot import get_shelter_advice
+from app.result_store import shelter_results
 from pathlib import Path
 from app.shelters import bp
 from io import BytesIO
 import re  # Added for regex
-from openai import OpenAI  # Make sure OpenAI SDK is installed
+from app.sse import sse_text_stream, sse_response
+from app.llm import openai_client, timeout_for
+from app import llm_cache
 
-# Initialize OpenAI client
-client = OpenAI(api_key="YOUR_API_KEY_HERE")  # Replace with your API key
+# Search results live in shelter_results keyed by map id (shared across
+# workers when SHELTER_STORE_DIR is set); the session remembers the
+# caller's latest id. The folium HTML is only built when first downloaded.
 
-# Store the last map HTML in memory
-last_map_html = ""
-last_shelters = []
+def _result(map_id=None):
+    return shelter_results.get(map_id or session.get("shelter_map_id"))
 
 @bp.route("/")
 def index():
@@ -21,7 +24,12 @@ def index():
 
 @bp.route("/generate", methods=["POST"])
 def generate():
-    global last_map_html, last_shelters
+    """
+    Form fields: lat, lon, search_radius_km, format = html | geojson.
+    "geojson" returns the shelters as a FeatureCollection for client-side
+    clustering instead of a prebuilt folium page. The response carries a
+    map_id for /download-map/<map_id> and /chat.
+    """
     try:
         lat = float(request.form["lat"])
         lon = float(request.form["lon"])
@@ -30,28 +38,63 @@ def generate():
         return jsonify({"error": "Invalid input"}), 400
 
     shelters = fetch_osm_shelters(lat, lon, search)
-    last_shelters = shelters
-
-    # Generate map HTML dynamically
-    last_map_html = create_map(lat, lon, shelters)
-
-    return jsonify({
-        "message": f"Found {len(shelters)} shelter(s).",
-        "map_html": last_map_html,
-        "shelters_count": len(shelters)
-    })
+    partial = getattr(shelters, "partial", False)
+    shelters = list(shelters)
+    record = {"lat": lat, "lon": lon, "shelters": shelters, "partial": partial}
+
+    result = {
+        "message": f"Found {len(shelters)} shelter(s)."
+                   + (" Some map areas could not be searched; try again for complete results." if partial else ""),
+        "shelters_count": len(shelters),
+        "partial": partial,
+    }
+    if request.form.get("format") == "geojson":
+        result["geojson"] = shelters_geojson(lat, lon, shelters)
+    else:
+        record["map_html"] = result["map_html"] = create_map(lat, lon, shelters)
+    result["map_id"] = session["shelter_map_id"] = shelter_results.put(record)
+    return jsonify(result)
 
 @bp.route("/download-map")
-def download_map():
-    global last_map_html
-    if not last_map_html:
+@bp.route("/download-map/<map_id>")
+def download_map(map_id=None):
+    """The folium map for map_id, or for this session's latest search."""
+    record = _result(map_id)
+    if record is None:
         return abort(404, "No map generated yet.")
+    if not record.get("map_html"):
+        record["map_html"] = create_map(record["lat"], record["lon"], record["shelters"])
+        shelter_results.update(map_id or session["shelter_map_id"], record)
 
     buffer = BytesIO()
-    buffer.write(last_map_html.encode("utf-8"))
+    buffer.write(record["map_html"].encode("utf-8"))
     buffer.seek(0)
     return send_file(buffer, as_attachment=True, download_name="shelter_map.html", mimetype="text/html")
 
+@bp.route("/chat", methods=["POST"])
+def chat():
+    """
+    Expects JSON: {"question", "map_id": optional, "blast_radius_km": optional}.
+    Advises on the given search (default: this session's latest); only the
+    nearest shelters outside the blast radius are sent to the model.
+    """
+    data = request.get_json(silent=True) or {}
+    question = (data.get("question") or "").strip()
+    if not question:
+        return jsonify({"error": "No question provided"}), 400
+    try:
+        blast = float(data.get("blast_radius_km") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid blast_radius_km"}), 400
+
+    record = _result(data.get("map_id")) or {"lat": None, "lon": None, "shelters": []}
+    try:
+        answer = get_shelter_advice(question, record["shelters"], record["lat"], record["lon"],
+                                    blast_radius_km=blast)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"answer": answer})
+
 @bp.route("/history")
 def history():  # Renamed for clarity
     return render_template("history.html")
@@ -60,8 +103,42 @@ def history():  # Renamed for clarity
 def home():
     return render_template("policymaker.html")
 
+def _policy_messages(mode, user_message, country):
+    if mode == "reply":
+        return [
+            {"role": "system", "content": "You are an expert in asteroid defense and space policy."},
+            {"role": "user", "content": f"Answer this user question regarding {country}: {user_message}"}
+        ]
+    if mode == "evaluate":
+        return [
+            {"role": "system", "content": "You are an expert in asteroid defense and policy evaluation."},
+            {"role": "user", "content": f"Evaluate this asteroid policy: {user_message}. Give a numeric rating out of 100 and explain why it is not perfect."}
+        ]
+    # generate_policy
+    return [
+        {"role": "system", "content": "You are an expert in asteroid defense policy. Generate a concise, actionable asteroid defense policy based on user input."},
+        {"role": "user", "content": f"User input: {user_message}. Generate a suitable policy."}
+    ]
+
+def _policy_result(mode, ai_text):
+    """JSON fields returned for each mode, parsed from the model's full answer."""
+    ai_text = ai_text.strip()
+    if mode == "reply":
+        return {"ai_reply": ai_text}
+    if mode == "evaluate":
+        rating_match = re.search(r'(\d{1,3})', ai_text)
+        rating = int(rating_match.group(1)) if rating_match else 0
+        reason_match = re.search(r'(Reason[:\-]\s*)(.*)', ai_text, re.IGNORECASE)
+        reason = reason_match.group(2).strip() if reason_match else ai_text
+        return {"rating": rating, "reason": reason}
+    return {"generated_policy": ai_text}
+
 @bp.route("/policy-maker/ask_ai", methods=["POST"])
 def ask_ai():
+    """
+    Expects JSON: {"message", "country", "mode": reply|evaluate|generate_policy, "stream": bool}
+    With "stream": server-sent "token" events, then "done" carrying the mode's fields.
+    """
     data = request.json
     user_message = data.get("message", "")
     country = data.get("country", "Unknown")
@@ -70,43 +147,21 @@ def ask_ai():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
 
+    messages = _policy_messages(mode, user_message, country)
+    client = openai_client().with_options(timeout=timeout_for("gpt-4o-mini"))
+    # default sampling temperature (1.0): cached only if "policy" is in LLM_CACHE_OPT_IN
+    cache_args = ("policy", 1.0, messages[0]["content"], user_message, f"{mode}|{country}")
     try:
-        if mode == "reply":
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert in asteroid defense and space policy."},
-                    {"role": "user", "content": f"Answer this user question regarding {country}: {user_message}"}
-                ]
-            )
-            ai_text = response.choices[0].message.content.strip()
-            return jsonify({"ai_reply": ai_text})
-
-        elif mode == "evaluate":
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert in asteroid defense and policy evaluation."},
-                    {"role": "user", "content": f"Evaluate this asteroid policy: {user_message}. Give a numeric rating out of 100 and explain why it is not perfect."}
-                ]
-            )
-            ai_text = response.choices[0].message.content.strip()
-            rating_match = re.search(r'(\d{1,3})', ai_text)
-            rating = int(rating_match.group(1)) if rating_match else 0
-            reason_match = re.search(r'(Reason[:\-]\s*)(.*)', ai_text, re.IGNORECASE)
-            reason = reason_match.group(2).strip() if reason_match else ai_text
-            return jsonify({"rating": rating, "reason": reason})
-
-        else:  # generate_policy
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert in asteroid defense policy. Generate a concise, actionable asteroid defense policy based on user input."},
-                    {"role": "user", "content": f"User input: {user_message}. Generate a suitable policy."}
-                ]
-            )
-            policy_text = response.choices[0].message.content.strip()
-            return jsonify({"generated_policy": policy_text})
+        if data.get("stream"):
+            def chunks():
+                response = client.chat.completions.create(model="gpt-4o-mini", messages=messages, stream=True)
+                return (c.choices[0].delta.content for c in response if c.choices)
+            return sse_response(sse_text_stream(llm_cache.cached_stream(*cache_args, chunks),
+                                                lambda text: _policy_result(mode, text)))
+
+        text = llm_cache.cached_call(*cache_args, lambda: client.chat.completions.create(
+            model="gpt-4o-mini", messages=messages).choices[0].message.content)
+        return jsonify(_policy_result(mode, text))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,49 @@
+"""Server-sent events helpers shared by the streaming endpoints."""
+import json
+import time
+from flask import Response, stream_with_context
+
+
+def sse_event(data, event=None) -> str:
+    """One SSE frame; `data` is JSON-encoded."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+def sse_response(events) -> Response:
+    """Stream an iterable of sse_event() frames without proxy buffering."""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_text_stream(chunks, finalize=None):
+    """
+    Relay LLM text chunks as "token" events, then one "done" event with the
+    full reply, time-to-first-token and total stream time in ms.
+    `finalize(reply) -> dict` may add fields to the "done" event.
+    """
+    t0 = time.perf_counter()
+    ttft = None
+    parts = []
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            parts.append(chunk)
+            yield sse_event({"text": chunk}, "token")
+    except Exception as e:
+        yield sse_event({"error": str(e)}, "error")
+    reply = "".join(parts)
+    done = {
+        "reply": reply,
+        "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+        "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    if finalize:
+        done.update(finalize(reply))
+    yield sse_event(done, "done")
@@ -0,0 +1,97 @@
+"""
+Startup profiling and warm-up.
+
+create_app records how long each init step takes in `timings`. LLM clients,
+the chatbot knowledge base and heavy libraries (langchain, openai, plotly,
+folium) are built on first use, or ahead of time by warm_up() in a
+background thread when STARTUP_WARMUP is set.
+
+    python -m app.startup [--budget-ms N]
+
+prints a per-import (python -X importtime) and per-init report for a fresh
+process with outbound services disabled, and exits non-zero when the total
+exceeds the budget, so it can run as a CI check.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+timings: dict[str, float] = {}      # init step → milliseconds
+
+
+@contextmanager
+def timed(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(1000 * (time.perf_counter() - t0), 2)
+
+
+def warm_up():
+    """Build the chatbot knowledge and LLM clients off the request path."""
+    def run():
+        from app.neo.routes import knowledge, llm
+        with timed("warmup.neo_knowledge"):
+            knowledge()
+        with timed("warmup.neo_llm"):
+            llm()
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+
+
+# ---------- report ----------
+_PROBE = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+create_app()
+t2 = time.perf_counter()
+from app.startup import timings
+print(json.dumps({"import_ms": 1000 * (t1 - t0), "create_app_ms": 1000 * (t2 - t1), "steps": timings}))
+"""
+
+
+def profile(top=15) -> dict:
+    """Run a fresh interpreter under -X importtime and collect the timings."""
+    env = {**os.environ, "CATALOG_SYNC_INTERVAL": "0", "STARTUP_WARMUP": "0", "PYTHONWARNINGS": "ignore"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE],
+                          capture_output=True, text=True, env=env, check=True)
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):     # top-level imports only
+            imports.append((name.strip(), int(cumulative) / 1000))
+    imports.sort(key=lambda kv: -kv[1])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports_ms"] = imports[:top]
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-ms", type=float, default=0, help="fail if import + create_app exceeds this")
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    r = profile(args.top)
+    total = r["import_ms"] + r["create_app_ms"]
+    print(f"import app           {r['import_ms']:8.1f} ms")
+    print(f"create_app()         {r['create_app_ms']:8.1f} ms")
+    for step, ms in r["steps"].items():
+        print(f"  {step:<18} {ms:8.1f} ms")
+    print("slowest top-level imports (cumulative):")
+    for name, ms in r["imports_ms"]:
+        print(f"  {name:<40} {ms:8.1f} ms")
+    print(f"total                {total:8.1f} ms")
+    if args.budget_ms and total > args.budget_ms:
+        sys.exit(f"startup {total:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
@@ -1,10 +1,8 @@
 # ----------  story.py  ----------
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from app.config import Config
-
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.7, openai_api_key=Config.OPENAI_API_KEY)
+from app.llm import chain, chat_model
 
 zone_prompts = {
     "crater":  "Explain in a few short sentences what happens inside the {c:.1f} km crater. make it bulletpoint based",
@@ -13,8 +11,46 @@ zone_prompts = {
     "tsunami": "Explain in a few short sentences the blue tsunami circle ({ts:.1f} m) for coastal areas. make it bulletpoint based"
 }
 
+def _build_zone_chains():
+    """One chain per zone, shared by every request."""
+    from langchain.prompts import ChatPromptTemplate
+    from langchain.chains import LLMChain
+
+    llm = chat_model("gpt-3.5-turbo", 0.7)
+    return {
+        zone: LLMChain(llm=llm, prompt=ChatPromptTemplate.from_template(template))
+        for zone, template in zone_prompts.items()
+    }
+
+# bounded pool so the zones of one request run concurrently
+_pool = ThreadPoolExecutor(max_workers=Config.STORY_WORKERS, thread_name_prefix="zone-story")
+
+
+def _quantize(x, sig=2):
+    """Round to `sig` significant figures so near-identical scenarios share a story."""
+    return float(f"{x:.{sig}g}")
+
+
+@lru_cache(maxsize=Config.STORY_CACHE_SIZE)
+def _cached_story(zone, c, s, ts):
+    return chain("zone_stories", _build_zone_chains)[zone].run(c=c, s=s, ts=ts)
+
+
 def generate_zone_story(zone, c, s, op, w, th, ts):
-    template = zone_prompts[zone]
-    prompt = ChatPromptTemplate.from_template(template)
-    chain  = LLMChain(llm=llm, prompt=prompt)
-    return chain.run(c=c, s=s, op=op, w=w, th=th, ts=ts)
\ No newline at end of file
+    """
+    Story for one zone, memoized on the zone and the quantized crater,
+    seismic and tsunami values (the only numbers the prompts use).
+    """
+    return _cached_story(zone, _quantize(c), _quantize(s), _quantize(ts))
+
+
+def iter_zone_stories(zones, c, s, op, w, th, ts):
+    """Yield (zone, story) pairs as soon as each concurrent generation finishes."""
+    futures = {_pool.submit(generate_zone_story, z, c, s, op, w, th, ts): z for z in zones}
+    for fut in as_completed(futures):
+        yield futures[fut], fut.result()
+
+
+def generate_zone_stories(zones, c, s, op, w, th, ts):
+    """{zone: story} for all zones, generated concurrently."""
+    return dict(iter_zone_stories(zones, c, s, op, w, th, ts))
@@ -0,0 +1,134 @@
+"""
+Text-to-speech audio cache.
+
+Synthesized speech is stored on disk under sha256(model, voice, text), so
+the same answer is only synthesized once (/neo/chat runs at temperature 0,
+so repeated questions produce identical text). register() records the
+text next to the key and returns it; stream() serves the cached file or,
+on a miss, relays the TTS response while writing it to the cache. The
+directory is bounded by TTS_CACHE_MAX_MB, evicting least recently used
+files first. Any worker sharing TTS_CACHE_DIR can serve any key.
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from app.config import Config
+from app.llm import openai_client, timeout_for
+
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_VOICE = "alloy"
+MIMETYPE = "audio/mpeg"
+CHUNK = 16 * 1024
+PENDING_TTL = 24 * 3600       # seconds a registered but never fetched text is kept
+
+_evict_lock = threading.Lock()
+
+
+def _dir() -> Path:
+    d = Path(Config.TTS_CACHE_DIR)
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def audio_key(text: str, voice: str = TTS_VOICE, model: str = TTS_MODEL) -> str:
+    return hashlib.sha256(f"{model}\0{voice}\0{text}".encode()).hexdigest()
+
+
+def valid_key(key: str) -> bool:
+    return len(key) == 64 and all(c in "0123456789abcdef" for c in key)
+
+
+def audio_path(key: str) -> Path:
+    return _dir() / f"{key}.mp3"
+
+
+def register(text: str, voice: str = TTS_VOICE, model: str = TTS_MODEL) -> str:
+    """Key for this text; remembers what to synthesize if it is not cached yet."""
+    key = audio_key(text, voice, model)
+    meta = _dir() / f"{key}.json"
+    if not audio_path(key).exists() and not meta.exists():
+        tmp = meta.with_suffix(f".{secrets.token_hex(4)}.tmp")
+        tmp.write_text(json.dumps({"text": text, "voice": voice, "model": model}), encoding="utf-8")
+        tmp.replace(meta)
+    return key
+
+
+def cached(key: str):
+    """Path of the cached audio (marked as recently used), or None."""
+    path = audio_path(key)
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def stream(key: str):
+    """
+    Iterator over the audio for a registered key, chunk by chunk as it is
+    synthesized; the file is saved to the cache once complete. Raises
+    KeyError for a key that was never registered.
+    """
+    try:
+        meta = json.loads((_dir() / f"{key}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        raise KeyError(key)
+    return _synthesize(key, meta)
+
+
+def _synthesize(key, meta):
+    client = openai_client().with_options(timeout=timeout_for(meta["model"]))
+    tmp = _dir() / f"{key}.{secrets.token_hex(4)}.part"
+    try:
+        with client.audio.speech.with_streaming_response.create(
+            model=meta["model"], voice=meta["voice"], input=meta["text"],
+        ) as response, open(tmp, "wb") as fh:
+            for chunk in response.iter_bytes(CHUNK):
+                fh.write(chunk)
+                yield chunk
+        tmp.replace(audio_path(key))
+        (_dir() / f"{key}.json").unlink(missing_ok=True)
+    finally:
+        tmp.unlink(missing_ok=True)
+    evict()
+
+
+def evict(max_bytes=None):
+    """Delete least recently used audio files until the cache fits, and stale registrations."""
+    max_bytes = Config.TTS_CACHE_MAX_MB * 2**20 if max_bytes is None else max_bytes
+    with _evict_lock:
+        cutoff = time.time() - PENDING_TTL
+        for p in _dir().glob("*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+            except OSError:
+                continue
+        files = []
+        for p in _dir().glob("*.mp3"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+
+def info() -> dict:
+    files = list(_dir().glob("*.mp3"))
+    return {
+        "files": len(files),
+        "bytes": sum(p.stat().st_size for p in files),
+        "max_bytes": Config.TTS_CACHE_MAX_MB * 2**20,
+        "dir": str(_dir()),
+    }
@@ -0,0 +1,214 @@
+"""
+Outbound HTTP.
+
+Every call to an external service (NASA NeoWs, Overpass, open-meteo) goes
+through request() or get_json():
+
+* one pooled keep-alive requests.Session per host;
+* retries with full-jitter exponential backoff for idempotent calls on
+  connection errors, 429 and 5xx;
+* a per-host circuit breaker: after BREAKER_FAILURES consecutive failures
+  the host is skipped for BREAKER_COOLDOWN seconds (CircuitOpen is raised
+  immediately), then a single trial call decides whether it closes again;
+* get_json() caches decoded bodies and serves them stale-while-revalidate,
+  and stale-if-error while the upstream is failing;
+* per-host counters, see metrics().
+
+Base URLs come from Config, so everything can be pointed at a local fake
+server.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import Config
+
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpen(requests.RequestException):
+    """The host's breaker is open; the call was not attempted."""
+
+
+class Breaker:
+    def __init__(self, failures, cooldown):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.streak = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial:
+                return False
+            self.trial = True           # one probe while half-open
+            return True
+
+    def record(self, ok: bool):
+        with self.lock:
+            self.trial = False
+            if ok:
+                self.streak, self.opened_at = 0, None
+            else:
+                self.streak += 1
+                if self.streak >= self.failures or self.opened_at is not None:
+                    self.opened_at = time.monotonic()
+
+
+_sessions: dict[str, requests.Session] = {}
+_breakers: dict[str, Breaker] = {}
+_stats: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _host(url) -> str:
+    return urlsplit(url).netloc
+
+
+def _for_host(host):
+    """(session, breaker, stats) for a host, created on first use."""
+    with _lock:
+        if host not in _sessions:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.UPSTREAM_POOL_SIZE)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sessions[host] = s
+            _breakers[host] = Breaker(Config.BREAKER_FAILURES, Config.BREAKER_COOLDOWN)
+            _stats[host] = {"requests": 0, "failures": 0, "retries": 0, "short_circuits": 0,
+                            "cache_hits": 0, "stale_served": 0, "latency_ms_total": 0.0}
+        return _sessions[host], _breakers[host], _stats[host]
+
+
+def _count(stats, key, n=1):
+    with _lock:
+        stats[key] += n
+
+
+def request(method, url, *, timeout=None, retries=None, idempotent=None, **kwargs) -> requests.Response:
+    """
+    Send one request through the host's pooled session. Raises CircuitOpen
+    while the host is failing, otherwise requests.RequestException for
+    errors, including HTTP errors left after retries (raise_for_status).
+    POSTs that only read (e.g. Overpass queries) may pass idempotent=True.
+    """
+    method = method.upper()
+    session, breaker, stats = _for_host(_host(url))
+    if not breaker.allow():
+        _count(stats, "short_circuits")
+        raise CircuitOpen(f"circuit open for {_host(url)}")
+
+    idempotent = method in IDEMPOTENT if idempotent is None else idempotent
+    attempts = 1 + ((Config.UPSTREAM_RETRIES if retries is None else retries) if idempotent else 0)
+    timeout = Config.UPSTREAM_TIMEOUT if timeout is None else timeout
+
+    recorded = False
+    try:
+        for attempt in range(attempts):
+            if attempt:
+                _count(stats, "retries")
+                time.sleep(random.uniform(0, Config.UPSTREAM_BACKOFF * 2 ** (attempt - 1)))
+            t0 = time.perf_counter()
+            _count(stats, "requests")
+            try:
+                resp = session.request(method, url, timeout=timeout, **kwargs)
+                error = None if resp.status_code not in RETRY_STATUS else requests.HTTPError(
+                    f"{resp.status_code} from {url}", response=resp)
+            except requests.RequestException as e:
+                error = e
+            _count(stats, "latency_ms_total", 1000 * (time.perf_counter() - t0))
+            if error is None:
+                breaker.record(True)
+                recorded = True
+                resp.raise_for_status()     # 4xx: the caller's fault, not the host's
+                return resp
+            _count(stats, "failures")
+
+        breaker.record(False)
+        recorded = True
+        raise error
+    finally:
+        if not recorded:                    # anything else escaped: a failure, and ends a half-open trial
+            _count(stats, "failures")
+            breaker.record(False)
+
+
+# ---------- JSON cache (stale-while-revalidate) ----------
+_cache = OrderedDict()                     # (url, params) → (fetched_at, body)
+_refreshing = set()
+_cache_lock = threading.Lock()
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr")
+
+
+def _fetch_json(key, url, params, method, kwargs):
+    body = request(method, url, params=params, **kwargs).json()
+    with _cache_lock:
+        _cache[key] = (time.time(), body)
+        _cache.move_to_end(key)
+        while len(_cache) > Config.UPSTREAM_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body
+
+
+def _refresh(key, url, params, method, kwargs):
+    try:
+        _fetch_json(key, url, params, method, kwargs)
+    except (requests.RequestException, ValueError):
+        pass                                # keep serving the stale copy
+    finally:
+        with _cache_lock:
+            _refreshing.discard(key)
+
+
+def get_json(url, params=None, *, ttl=300, stale_ttl=3600, method="GET", **kwargs):
+    """
+    Decoded JSON body of a cached call. Fresh for `ttl` seconds; for a
+    further `stale_ttl` seconds the cached body is returned at once while a
+    background call refreshes it, and is also returned if the upstream
+    fails. Raises like request() when there is nothing usable cached.
+    """
+    key = (method, url, tuple(sorted((params or {}).items())), repr(kwargs.get("data")))
+    stats = _for_host(_host(url))[2]
+    with _cache_lock:
+        hit = _cache.get(key)
+    age = time.time() - hit[0] if hit else None
+
+    if hit and age < ttl:
+        _count(stats, "cache_hits")
+        return hit[1]
+    if hit and age < ttl + stale_ttl:
+        _count(stats, "stale_served")
+        with _cache_lock:
+            start = key not in _refreshing
+            _refreshing.add(key)
+        if start:
+            _refresh_pool.submit(_refresh, key, url, params, method, kwargs)
+        return hit[1]
+    return _fetch_json(key, url, params, method, kwargs)
+
+
+def metrics() -> dict:
+    """Per-host counters, breaker state and mean latency."""
+    with _lock:
+        out = {}
+        for host, s in _stats.items():
+            out[host] = {**s, "latency_ms_total": round(s["latency_ms_total"], 1),
+                         "mean_latency_ms": round(s["latency_ms_total"] / s["requests"], 1) if s["requests"] else None,
+                         "breaker": _breakers[host].state}
+        return out
@@ -2,6 +2,7 @@ function addMsg(sender, txt) {
     const log = document.getElementById('chatLog');
     log.innerHTML += `<div><b>${sender}:</b> ${txt}</div>`;
     log.scrollTop = log.scrollHeight;
+    return log.lastElementChild;
 }
 
 async function sendChat() {
@@ -14,8 +15,16 @@ async function sendChat() {
     const resp = await fetch("/chat", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ message: msg, page })
+        body: JSON.stringify({ message: msg, page, stream: true })
+    });
+    // tokens are appended as they stream in
+    const line = addMsg("AI", "");
+    const text = document.createElement("span");
+    line.appendChild(text);
+    const log = document.getElementById('chatLog');
+    await readSSE(resp, (name, data) => {
+        if (name === "token") text.textContent += data.text;
+        else if (name === "error") text.textContent += ` [${data.error}]`;
+        log.scrollTop = log.scrollHeight;
     });
-    const data = await resp.json();
-    addMsg("AI", data.reply);
 }
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Shared fixtures. Settings come from the environment when app.config is
+first imported, so everything stateful points at a temp directory and no
+test touches the network (no catalog sync, no warm-up, no real LLM key).
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="planetwatch-tests-")
+os.environ.update({
+    "OPENAI_API_KEY": "sk-test",
+    "CATALOG_DB": os.path.join(_tmp, "catalog.sqlite3"),
+    "CATALOG_SYNC_INTERVAL": "0",
+    "STARTUP_WARMUP": "0",
+    "LLM_CACHE_DB": os.path.join(_tmp, "llm_cache.sqlite3"),
+    "TTS_CACHE_DIR": os.path.join(_tmp, "tts_cache"),
+})
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    from app import create_app
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
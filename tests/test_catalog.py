@@ -0,0 +1,73 @@
+"""app.catalog sync against recorded NeoWs browse pages (tests/fixtures)."""
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from app import catalog
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class Resp:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def neows(monkeypatch):
+    """Serve the fixture pages in place of NeoWs; returns the list of pages requested."""
+    pages = [json.loads((FIXTURES / f"neows_browse_{p}.json").read_text()) for p in range(2)]
+    requested = []
+
+    def request(method, url, params=None, **kwargs):
+        assert url.endswith("/neo/browse")
+        requested.append(params["page"])
+        return Resp(pages[params["page"]])
+
+    monkeypatch.setattr(catalog.upstream, "request", request)
+    return requested
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "catalog.sqlite3"
+
+
+def test_sync_pages_resumes_and_wraps(neows, db):
+    assert catalog.sync(max_pages=1, db_path=db) == 3
+    assert catalog.sync(max_pages=1, db_path=db) == 2
+    assert neows == [0, 1]
+    assert [n["name"] for n in catalog.all_neos(db)][:2] == ["433 Eros (A898 PA)", "719 Albert (A911 TB)"]
+    assert catalog.count(db) == 5
+
+    assert catalog.sync(max_pages=2, db_path=db) == 0          # wrapped to page 0, nothing changed
+    assert neows == [0, 1, 0, 1]
+
+
+def test_get_neos_bootstraps_an_empty_catalog(neows, db):
+    neos = catalog.get_neos(3, db_path=db)
+    assert [n["id"] for n in neos] == ["2000433", "2000719", "2000887"]
+    assert float(neos[0]["orbital_data"]["semi_major_axis"]) == pytest.approx(1.458)
+
+
+def test_sync_skips_while_another_process_holds_the_lease(neows, db):
+    assert catalog._claim("lease_until", time.time() + 60, db)  # as another worker would
+    assert catalog.sync(max_pages=1, db_path=db) == 0
+    assert neows == []
+    catalog._release("lease_until", db)
+    assert catalog.sync(max_pages=1, db_path=db) == 3
+
+
+def test_scheduled_sync_runs_once_per_interval_across_workers(neows, db, monkeypatch):
+    monkeypatch.setattr(catalog.Config, "CATALOG_SYNC_PAGES", 2)
+    results = [catalog.sync_if_due(3600, db_path=db) for _ in range(4)]   # four workers ticking
+    assert results[0] == 5 and results[1:] == [None] * 3
+    assert neows == [0, 1]
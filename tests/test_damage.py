@@ -0,0 +1,27 @@
+"""Damage radii from app.damage against the closed-form physics models."""
+import pytest
+
+from app.damage import damage_radii, mmi_to_magnitude
+from app.physics import seismic
+
+MT = 4.184e15
+
+
+def seismic_radii(mt):
+    return {z["threshold"]: z["radius_km"] for z in damage_radii(mt * MT) if z["quantity"] == "seismic"}
+
+
+@pytest.mark.parametrize("mt, mmi, expected_km", [
+    (100, 7, 298.2),
+    (100, 5, 576.7),
+    (1000, 7, 437.8),
+])
+def test_seismic_radius_past_the_60_km_step(mt, mmi, expected_km):
+    radius = seismic_radii(mt)[mmi_to_magnitude(mmi)]
+    assert radius == pytest.approx(expected_km, rel=0.01)
+    threshold = mmi_to_magnitude(mmi)
+    assert seismic(mt * MT, 0.98 * radius) > threshold > seismic(mt * MT, 1.02 * radius)
+
+
+def test_seismic_radius_beyond_near_field_range_is_unbounded():
+    assert seismic_radii(1000)[mmi_to_magnitude(5)] is None      # still 4.42 at 700 km
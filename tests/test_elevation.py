@@ -0,0 +1,57 @@
+"""/impact/elevation input checks and the no-DEM path (no elevation model is bundled)."""
+import numpy as np
+import pytest
+
+from app import dem
+
+
+@pytest.mark.parametrize("radius", ["-5", "0", "nan", "inf"])
+def test_rejects_bad_radius(client, radius):
+    r = client.get(f"/impact/elevation?lat=10&lon=20&radius_km={radius}")
+    assert r.status_code == 400
+
+
+def test_rejects_non_finite_position(client):
+    assert client.get("/impact/elevation?lat=nan&lon=20&radius_km=5").status_code == 400
+
+
+def test_no_dem_is_unavailable_not_mock(client, monkeypatch):
+    monkeypatch.setattr(dem, "available", lambda: False)
+    r = client.get("/impact/elevation?lat=10&lon=20&radius_km=5")
+    assert r.status_code == 503
+    assert dem.elevation_grid(10, 20, 5) is None
+
+
+def test_grid_from_dem(client, monkeypatch, tmp_path):
+    path = tmp_path / "dem.bin"
+    np.arange(dem.ROWS * dem.COLS, dtype="<i2").reshape(dem.ROWS, dem.COLS).tofile(path)
+    monkeypatch.setattr(dem, "DEM_PATH", path)
+    monkeypatch.setattr(dem, "_dem", None)
+    r = client.get("/impact/elevation?lat=10&lon=20&radius_km=50&cells=16&format=json")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["source"] == "dem" and (body["rows"], body["cols"]) == (4, 4)
+
+
+@pytest.mark.parametrize("place, lat, lon, low, high", [
+    ("Tibetan Plateau", 33.0, 88.0, 4500, 5500),
+    ("Greenland summit", 72.58, -38.46, 2900, 3400),
+    ("South Pole", -89.9, 0.0, 2600, 3000),
+    ("Amazon at Manaus", -3.1, -60.0, -50, 200),
+    ("Central Pacific", 0.0, -150.0, -5000, -3800),
+    ("Mariana Trench", 11.35, 142.2, -9500, -7000),
+])
+def test_bundled_dem_known_elevations(place, lat, lon, low, high):
+    assert dem.available(), "app/data/dem_0p25deg.bin is missing"
+    assert low <= dem.height(lat, lon) <= high, place
+    assert low <= float(dem.sample(lat, lon)) <= high, place
+
+
+def test_sim_reports_dem_terrain(client, monkeypatch):
+    from app.impact import routes
+    monkeypatch.setattr(routes, "iter_zone_stories", lambda *a: iter(()))
+    monkeypatch.setattr(routes, "generate_zone_stories", lambda *a: {})
+    r = client.post("/impact/sim", json={"lat": 33.0, "lon": 88.0, "dist": 50, "en": 10})
+    body = r.get_json()
+    assert 4500 <= body["terrain_height"] <= 5500
+    assert body["elevation_map"]["source"] == "dem"
@@ -0,0 +1,44 @@
+"""Input validation of the /impact JSON endpoints."""
+import pytest
+
+from app.config import Config
+
+MC_OK = {"diameter_km": [0.1, 0.2], "velocity_kms": 18.0, "n": 200, "seed": 1}
+
+
+def test_montecarlo_accepts_valid_input(client):
+    r = client.post("/impact/montecarlo", json=MC_OK)
+    assert r.status_code == 200
+    assert r.get_json()["n"] == 200
+
+
+@pytest.mark.parametrize("change", [
+    {"diameter_km": [float("nan"), 0.2]},
+    {"diameter_km": [0.1, float("inf")]},
+    {"diameter_km": [0, 0.2]},
+    {"velocity_kms": float("nan")},
+    {"velocity_kms": -5},
+    {"density": -3000},
+    {"density": float("nan")},
+    {"dist_km": -1},
+    {"dist_km": float("inf")},
+    {"n": 0},
+    {"n": -10},
+    {"n": Config.MC_MAX_SAMPLES + 1},
+    {"seed": -1},
+])
+def test_montecarlo_rejects_bad_input(client, change):
+    assert client.post("/impact/montecarlo", json={**MC_OK, **change}).status_code == 400
+
+
+def test_profile_accepts_valid_input(client):
+    r = client.post("/impact/profile", json={"lat": 10, "lon": 20, "en": 100})
+    assert r.status_code == 200
+    assert r.get_json()["geojson"]["features"]
+
+
+@pytest.mark.parametrize("field", ["lat", "lon", "en"])
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_profile_rejects_non_finite_input(client, field, value):
+    body = {"lat": 10, "lon": 20, "en": 100, field: value}
+    assert client.post("/impact/profile", json=body).status_code == 400
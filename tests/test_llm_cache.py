@@ -0,0 +1,65 @@
+"""app.llm_cache against a throwaway SQLite file."""
+import pytest
+
+from app import llm_cache
+from app.config import Config
+
+
+@pytest.fixture(autouse=True)
+def cache_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "LLM_CACHE_DB", str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(Config, "LLM_CACHE_OPT_IN", "")
+    monkeypatch.setattr(Config, "LLM_CACHE_TTLS", "")
+    monkeypatch.setattr(Config, "LLM_CACHE_TTL", 3600)
+
+
+def rows():
+    with llm_cache._connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def test_cached_call_hits_on_normalized_question():
+    calls = []
+
+    def call():
+        calls.append(1)
+        return "Ceres is a dwarf planet."
+
+    for q in ("What is Ceres?", "  what is   ceres "):
+        assert llm_cache.cached_call("ask", 0, "sys", q, "", call) == "Ceres is a dwarf planet."
+    assert len(calls) == 1
+    assert llm_cache.stats()["endpoints"]["ask"]["hits"] == 1
+
+
+def test_sampled_calls_are_not_cached():
+    calls = []
+    for _ in range(2):
+        llm_cache.cached_call("ask", 0.7, "sys", "q", "", lambda: calls.append(1) or "reply")
+    assert len(calls) == 2
+
+
+def test_put_prunes_expired_entries_by_probability(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_CACHE_TTLS", "old=-1")
+    monkeypatch.setattr(llm_cache, "PRUNE_PROBABILITY", 0)
+    for i in range(3):
+        llm_cache.put("old", f"k{i}", "stale", 10)
+    assert rows() == 3
+    assert llm_cache.get("old", "k0") is None          # expired entries are never served
+
+    monkeypatch.setattr(llm_cache, "PRUNE_PROBABILITY", 1)
+    llm_cache.put("new", "fresh", "reply", 10)
+    assert rows() == 1
+    assert llm_cache.get("new", "fresh") == "reply"
+
+
+def test_prunes_about_once_per_hundred_writes(monkeypatch):
+    draws = iter([0.5] * 99 + [0.001])
+    monkeypatch.setattr(llm_cache.random, "random", lambda: next(draws))
+    monkeypatch.setattr(Config, "LLM_CACHE_TTLS", "old=-1")
+    llm_cache.put("old", "expired", "stale", 10)
+    monkeypatch.setattr(Config, "LLM_CACHE_TTLS", "")
+    for i in range(98):
+        llm_cache.put("new", f"k{i}", "reply", 10)
+    assert rows() == 99
+    llm_cache.put("new", "last", "reply", 10)
+    assert rows() == 99                                 # the expired row went on the 100th write
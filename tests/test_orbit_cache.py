@@ -0,0 +1,40 @@
+"""Disk tier of the orbit-geometry cache shared between workers (app/orbit_cache.py)."""
+import threading
+
+import numpy as np
+
+from app.orbit_cache import OrbitCache
+
+TABLE = np.array([[1.3, 0.3, 7.0, 40.0, 80.0], [2.1, 0.6, 12.0, 200.0, 10.0]])
+
+
+def test_concurrent_fills_of_one_key_do_not_race(tmp_path):
+    errors = []
+
+    def worker():
+        try:
+            OrbitCache(disk_dir=tmp_path).points(TABLE)
+        except Exception as e:          # pragma: no cover - the failure being tested for
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".npy", ".npy"]   # no temp files left
+
+
+def test_disk_write_failure_is_a_miss_not_an_error(tmp_path, monkeypatch):
+    def full_disk(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(np, "save", full_disk)
+    cache = OrbitCache(disk_dir=tmp_path)
+    points = cache.points(TABLE)
+
+    assert len(points) == 2 and points[0].shape == (3, 121)
+    assert list(tmp_path.iterdir()) == []
+    assert cache.points(TABLE)[0] is points[0]          # still served from memory
@@ -0,0 +1,54 @@
+"""Overpass tile fan-out: bounded wait and partial results (app/osm.py)."""
+import threading
+import time
+
+import pytest
+import requests
+
+from app import osm
+from app.config import Config
+from app.geo02 import geohash_cover
+
+
+@pytest.fixture(autouse=True)
+def empty_tile_cache():
+    osm._tiles.clear()
+    yield
+    osm._tiles.clear()
+
+
+def _shelter(gh, south, west, north, east):
+    return {"id": f"node/{gh}", "name": gh, "lat": (south + north) / 2, "lon": (west + east) / 2}
+
+
+def test_failed_and_late_tiles_make_the_result_partial(monkeypatch):
+    lat, lon, radius = 48.85, 2.35, 20
+    tiles = geohash_cover(lat, lon, radius, 4)
+    assert len(tiles) >= 3
+    failing, slow = tiles[0], tiles[1]
+    release = threading.Event()
+
+    def fake_bbox(south, west, north, east):
+        gh = next(g for g in tiles if osm.geohash_bbox(g) == (south, west, north, east))
+        if gh == failing:
+            raise requests.HTTPError("429 from overpass")
+        if gh == slow:
+            release.wait(5)
+        return [_shelter(gh, south, west, north, east)]
+
+    monkeypatch.setattr(osm, "_overpass_bbox", fake_bbox)
+    monkeypatch.setattr(Config, "OVERPASS_SEARCH_TIMEOUT", 0.5)
+    t0 = time.monotonic()
+    result = osm.fetch_overpass_shelters(lat, lon, radius)
+    elapsed = time.monotonic() - t0
+    release.set()
+
+    assert elapsed < 2
+    assert result.partial and set(result.failed_tiles) == {failing, slow}
+    assert all(s["id"] not in (f"node/{failing}", f"node/{slow}") for s in result)
+
+
+def test_complete_search_is_not_partial(monkeypatch):
+    monkeypatch.setattr(osm, "_overpass_bbox", lambda s, w, n, e: [])
+    result = osm.fetch_overpass_shelters(48.85, 2.35, 20)
+    assert result == [] and not result.partial
@@ -0,0 +1,103 @@
+"""Impact zone stories against a stub LLM chain (app/story.py, /impact/sim)."""
+import json
+import threading
+import time
+
+import pytest
+
+from app import llm, story
+
+
+class StubChain:
+    """Stands in for one zone's LLMChain: slow, thread-aware, counts calls."""
+
+    def __init__(self, zone, delay=0.2, fail=False):
+        self.zone, self.delay, self.fail = zone, delay, fail
+        self.calls = []
+
+    def run(self, **kwargs):
+        with stub_lock:
+            stub_state["active"] += 1
+            stub_state["peak"] = max(stub_state["peak"], stub_state["active"])
+        try:
+            time.sleep(self.delay)
+            self.calls.append(kwargs)
+            if self.fail:
+                raise RuntimeError(f"{self.zone} backend down")
+            return f"{self.zone} story"
+        finally:
+            with stub_lock:
+                stub_state["active"] -= 1
+
+
+stub_state = {"active": 0, "peak": 0}
+stub_lock = threading.Lock()
+
+
+@pytest.fixture
+def stub_chains(monkeypatch):
+    chains = {zone: StubChain(zone) for zone in story.zone_prompts}
+    monkeypatch.setitem(llm._chains, "zone_stories", chains)
+    stub_state.update(active=0, peak=0)
+    story._cached_story.cache_clear()
+    yield chains
+    story._cached_story.cache_clear()
+
+
+ZONES = ["crater", "shock", "quake", "tsunami"]
+
+
+def test_zones_fan_out_in_parallel(stub_chains):
+    t0 = time.perf_counter()
+    texts = story.generate_zone_stories(ZONES, 1.2, 6.1, 1e5, 50, 1e6, 30.0)
+    elapsed = time.perf_counter() - t0
+
+    assert texts == {z: f"{z} story" for z in ZONES}
+    assert stub_state["peak"] == len(ZONES)
+    assert elapsed < 2 * stub_chains["crater"].delay      # not 4 × delay
+
+
+def test_quantized_values_hit_the_memo(stub_chains):
+    first = story.generate_zone_story("crater", 1.234, 6.11, 0, 0, 0, 0.0)
+    again = story.generate_zone_story("crater", 1.229, 6.14, 1, 1, 1, 0.0)   # same to 2 s.f.
+    other = story.generate_zone_story("crater", 1.5, 6.1, 0, 0, 0, 0.0)
+
+    assert first == again == other == "crater story"
+    assert stub_chains["crater"].calls == [{"c": 1.2, "s": 6.1, "ts": 0.0}, {"c": 1.5, "s": 6.1, "ts": 0.0}]
+
+
+def _events(body):
+    """[(event, data), ...] from an SSE body."""
+    out = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        out.append((fields.get("event"), json.loads(fields["data"])))
+    return out
+
+
+SIM = {"lat": 10.0, "lon": 20.0, "dist": 50, "en": 1, "stream": True}
+
+
+def test_sse_physics_first_stories_then_done(client, stub_chains, monkeypatch):
+    monkeypatch.setattr("app.impact.routes.is_ocean", lambda lat, lon: False)
+    resp = client.post("/impact/sim", json=SIM)
+
+    assert resp.mimetype == "text/event-stream"
+    events = _events(resp.get_data(as_text=True))
+    names = [e for e, _ in events]
+    assert names[0] == "physics" and "crater" in events[0][1]
+    assert names[-1] == "done" and names.count("done") == 1
+    stories = {d["zone"]: d["text"] for e, d in events if e == "story"}
+    assert stories == {"crater": "crater story", "shock": "shock story",
+                       "quake": "quake story", "tsunami": "No tsunami risk."}
+    assert stub_chains["tsunami"].calls == []          # land impact: no tsunami prompt
+
+
+def test_sse_error_still_terminates(client, stub_chains, monkeypatch):
+    monkeypatch.setattr("app.impact.routes.is_ocean", lambda lat, lon: False)
+    stub_chains["shock"].fail = True
+    events = _events(client.post("/impact/sim", json={**SIM, "en": 3}).get_data(as_text=True))
+    names = [e for e, _ in events]
+
+    assert "error" in names and "backend down" in events[names.index("error")][1]["error"]
+    assert names[-1] == "done"
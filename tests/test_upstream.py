@@ -0,0 +1,61 @@
+"""Circuit breaker bookkeeping in app.upstream.request."""
+import time
+
+import pytest
+import requests
+
+from app import upstream
+from app.config import Config
+
+
+class Resp:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def host(monkeypatch):
+    monkeypatch.setattr(Config, "BREAKER_FAILURES", 1)
+    monkeypatch.setattr(Config, "BREAKER_COOLDOWN", 60)
+    name = f"breaker-test-{time.monotonic_ns()}.invalid"
+    session, breaker, _ = upstream._for_host(name)
+    return f"http://{name}/x", session, breaker
+
+
+def half_open(breaker):
+    breaker.streak, breaker.opened_at = 1, time.monotonic() - 61
+
+
+def test_unexpected_error_ends_half_open_trial(host, monkeypatch):
+    url, session, breaker = host
+    half_open(breaker)
+
+    def boom(*args, **kwargs):
+        raise ValueError("not a RequestException")
+
+    monkeypatch.setattr(session, "request", boom)
+    with pytest.raises(ValueError):
+        upstream.request("GET", url, retries=0)
+    assert not breaker.trial
+    assert breaker.state == "open"                  # the failed trial re-opened it
+
+    half_open(breaker)
+    monkeypatch.setattr(session, "request", lambda *a, **k: Resp())
+    assert upstream.request("GET", url).status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_request_exception_opens_breaker(host, monkeypatch):
+    url, session, breaker = host
+
+    def down(*args, **kwargs):
+        raise requests.ConnectionError("down")
+
+    monkeypatch.setattr(session, "request", down)
+    with pytest.raises(requests.ConnectionError):
+        upstream.request("GET", url, retries=0)
+    assert breaker.state == "open" and not breaker.trial
+    with pytest.raises(upstream.CircuitOpen):
+        upstream.request("GET", url)